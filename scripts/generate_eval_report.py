@@ -3,219 +3,372 @@
 生成评估HTML报告 - 增强版
 包括详细的统计信息、可视化结果和错误分析
 """
+import os
+import gzip
 import json
+import hashlib
+import mmap
 import argparse
+import html
+import itertools
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterator, Optional
+from urllib.parse import quote
+import io
 import base64
+from PIL import Image
+
+try:
+    import orjson
+except ImportError:  # orjson不可用时回退到标准库json
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash不可用时回退到hashlib
+    xxhash = None
+
+# 报告缓存格式版本，渲染逻辑有不兼容的改动时递增
+REPORT_CACHE_VERSION = 1
+
+# 小于该大小的结果文件直接串行解析: orjson单进程解析约300MB/s，而进程池需启动子进程，
+# 并把解析结果pickle回主进程(反序列化约为解析耗时的三成)，文件较小时得不偿失
+PARALLEL_PARSE_THRESHOLD = 256 * 1024 * 1024
+
+def _parse_chunk(buf: bytes) -> List[Dict[str, Any]]:
+    """解析由完整行组成的JSONL字节块"""
+    loads = orjson.loads if orjson is not None else json.loads
+    return [loads(line) for line in buf.splitlines() if line.strip()]
+
+def _split_on_newlines(buf: mmap.mmap, num_chunks: int) -> List[Tuple[int, int]]:
+    """将缓冲区按换行符切分为约num_chunks个(start, end)区间"""
+    size = len(buf)
+    step = -(-size // num_chunks)
+    bounds = []
+    start = 0
+    while start < size:
+        end = buf.find(b'\n', min(start + step, size))
+        end = size if end == -1 else end + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
 
 def load_results(jsonl_path: str) -> List[Dict[str, Any]]:
     """加载JSONL结果"""
-    results = []
-    with open(jsonl_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                results.append(json.loads(line))
-    return results
+    path = Path(jsonl_path)
+    if path.stat().st_size < PARALLEL_PARSE_THRESHOLD:
+        return _parse_chunk(path.read_bytes())
+    
+    # 大文件: mmap后按行边界分块，交给进程池并行解析
+    num_workers = os.cpu_count() or 1
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = _split_on_newlines(mm, num_workers)
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            chunks = executor.map(_parse_chunk, (mm[start:end] for start, end in bounds))
+            return list(itertools.chain.from_iterable(chunks))
 
 def load_metrics(json_path: str) -> Dict[str, Any]:
     """加载评估指标"""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    data = Path(json_path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+@lru_cache(maxsize=65536)
+def escape_html(text: str) -> str:
+    """HTML转义(GT/预测值等大量重复，按字符串缓存结果)"""
+    return html.escape(text, quote=True)
+
+@lru_cache(maxsize=65536)
+def escape_html_bytes(text: str) -> bytes:
+    """HTML转义并编码为UTF-8字节串(供结果行字节模板使用)"""
+    return escape_html(text).encode('utf-8')
+
+# 预览图最大尺寸(CSS限制为150px，按2倍适配高分屏)
+PREVIEW_SIZE = (300, 300)
 
 def image_to_base64(image_path: str) -> str:
-    """将图像转换为base64编码"""
+    """将图像缩放为预览尺寸并转换为WEBP的base64编码，图像不存在或无法解码时返回空串"""
+    if not Path(image_path).is_file():
+        return ""
     try:
-        with open(image_path, 'rb') as f:
-            return base64.b64encode(f.read()).decode('utf-8')
-    except:
+        with Image.open(image_path) as img:
+            img.thumbnail(PREVIEW_SIZE)
+            buffer = io.BytesIO()
+            img.save(buffer, format='WEBP', quality=75)
+    except (OSError, ValueError):  # 含PIL.UnidentifiedImageError
         return ""
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
 
-def generate_html_report(
-    results: List[Dict[str, Any]], 
-    metrics: Dict[str, Any],
-    output_path: str,
-    include_images: bool = False
-) -> None:
-    """生成HTML报告"""
+def link_images(image_paths: List[str], images_dir: Path) -> Dict[str, str]:
+    """
+    将图像以符号链接方式放入报告旁的images目录(不支持符号链接时复制)
+    
+    重复生成时只替换已有的符号链接，目录中的普通文件(包括原图本身)不会被删除或覆盖
+    
+    Returns:
+        {原图路径: 相对于报告的图像链接}
+    """
+    images_dir.mkdir(parents=True, exist_ok=True)
+    sources = {}
+    used_names = set()
+    for image_path in image_paths:
+        source = Path(image_path)
+        if not source.is_file():
+            continue
+        resolved = source.resolve()
+        
+        # 不同目录下的同名图像加序号区分，序号递增直到不与已用名称及目录中的普通文件冲突
+        name = source.name
+        suffix = 1
+        while True:
+            link_path = images_dir / name
+            if name not in used_names:
+                # 已是指向该图像的链接，或图像本身就在images目录中: 直接复用
+                if link_path.exists() and link_path.resolve() == resolved:
+                    break
+                # 只替换(可能已失效的)符号链接，绝不删除普通文件
+                if link_path.is_symlink() or not link_path.exists():
+                    break
+            name = f"{suffix}_{source.name}"
+            suffix += 1
+        used_names.add(name)
+        
+        if not (link_path.exists() and link_path.resolve() == resolved):
+            if link_path.is_symlink():
+                link_path.unlink()
+            try:
+                link_path.symlink_to(resolved)
+            except OSError:
+                shutil.copy2(source, link_path)
+        sources[image_path] = f"{images_dir.name}/{quote(name)}"
+    return sources
+
+def _summarize_results(
+    results: List[Dict[str, Any]]
+) -> Tuple[int, int, int, int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    单次遍历统计各状态数量，同时收集处理失败和识别错误的样本
     
-    html_content = f"""<!DOCTYPE html>
+    Returns:
+        (正确数, 错误数, 未知数, 失败数, 失败样本列表, 识别错误样本列表)
+    """
+    _get = dict.get
+    n_correct = n_incorrect = n_unknown = 0
+    failed_results = []
+    incorrect_results = []
+    for r in results:
+        correct = _get(r, 'correct')
+        if not _get(r, 'success'):
+            failed_results.append(r)
+        elif correct is None:
+            n_unknown += 1
+        if correct is True:
+            n_correct += 1
+        elif correct is False:
+            n_incorrect += 1
+            incorrect_results.append(r)
+    return n_correct, n_incorrect, n_unknown, len(failed_results), failed_results, incorrect_results
+
+# 结果表格每行所需字段及其缺省值
+ROW_FIELDS = (
+    'success', 'correct', 'image_name', 'ground_truth', 'predicted_answer',
+    'error', 'confidence', 'processing_time', 'retry_count'
+)
+ROW_FIELD_DEFAULTS = (False, None, 'N/A', 'N/A', 'N/A', 'Error', 0, 0, 0)
+_get_row_fields = itemgetter(*ROW_FIELDS)
+
+def _extract_row_fields(results: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    """一次性抽取结果表所需字段，字段齐全的行走itemgetter快速路径，缺失字段取缺省值"""
+    rows = []
+    for r in results:
+        try:
+            rows.append(_get_row_fields(r))
+        except KeyError:
+            rows.append(tuple(r.get(key, default) for key, default in zip(ROW_FIELDS, ROW_FIELD_DEFAULTS)))
+    return rows
+
+# 页面<head>部分(样式与脚本)不含动态内容，模块加载时构建并编码一次
+REPORT_HEAD = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>洗衣机旋钮识别评估报告</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 20px;
             line-height: 1.6;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.2);
             overflow: hidden;
-        }}
+        }
         
-        header {{
+        header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 40px;
             text-align: center;
-        }}
+        }
         
-        header h1 {{
+        header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
+        }
         
-        header .subtitle {{
+        header .subtitle {
             font-size: 1.1em;
             opacity: 0.9;
-        }}
+        }
         
-        .metrics-grid {{
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             padding: 40px;
             background: #f8f9fa;
-        }}
+        }
         
-        .metric-card {{
+        .metric-card {
             background: white;
             padding: 25px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
             transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
+        }
         
-        .metric-card:hover {{
+        .metric-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 5px 20px rgba(0,0,0,0.15);
-        }}
+        }
         
-        .metric-card .label {{
+        .metric-card .label {
             color: #666;
             font-size: 0.9em;
             margin-bottom: 10px;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
         
-        .metric-card .value {{
+        .metric-card .value {
             font-size: 2.5em;
             font-weight: bold;
             color: #667eea;
-        }}
+        }
         
-        .metric-card.success .value {{ color: #28a745; }}
-        .metric-card.accuracy .value {{ color: #17a2b8; }}
-        .metric-card.time .value {{ color: #ffc107; }}
+        .metric-card.success .value { color: #28a745; }
+        .metric-card.accuracy .value { color: #17a2b8; }
+        .metric-card.time .value { color: #ffc107; }
         
-        .section {{
+        .section {
             padding: 40px;
-        }}
+        }
         
-        .section-title {{
+        .section-title {
             font-size: 2em;
             margin-bottom: 30px;
             color: #333;
             border-bottom: 3px solid #667eea;
             padding-bottom: 10px;
-        }}
+        }
         
-        .results-table {{
+        .results-table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
             font-size: 0.95em;
-        }}
+        }
         
-        .results-table thead {{
+        .results-table thead {
             background: #667eea;
             color: white;
-        }}
+        }
         
-        .results-table th {{
+        .results-table th {
             padding: 15px;
             text-align: left;
             font-weight: 600;
-        }}
+        }
         
-        .results-table td {{
+        .results-table td {
             padding: 12px 15px;
             border-bottom: 1px solid #e0e0e0;
-        }}
+        }
         
-        .results-table tbody tr:hover {{
+        .results-table tbody tr:hover {
             background: #f8f9fa;
-        }}
+        }
         
-        .status-icon {{
+        .status-icon {
             font-size: 1.2em;
             font-weight: bold;
-        }}
+        }
         
-        .status-correct {{ color: #28a745; }}
-        .status-incorrect {{ color: #dc3545; }}
-        .status-unknown {{ color: #ffc107; }}
-        .status-failed {{ color: #6c757d; }}
+        .status-correct { color: #28a745; }
+        .status-incorrect { color: #dc3545; }
+        .status-unknown { color: #ffc107; }
+        .status-failed { color: #6c757d; }
         
-        .answer-cell {{
+        .answer-cell {
             max-width: 200px;
             overflow: hidden;
             text-overflow: ellipsis;
             white-space: nowrap;
-        }}
+        }
         
-        .confidence-bar {{
+        .confidence-bar {
             height: 8px;
             background: #e0e0e0;
             border-radius: 4px;
             overflow: hidden;
             margin-top: 5px;
-        }}
+        }
         
-        .confidence-fill {{
+        .confidence-fill {
             height: 100%;
             background: linear-gradient(90deg, #28a745, #ffc107, #dc3545);
             transition: width 0.3s ease;
-        }}
+        }
         
-        .image-preview {{
+        .image-preview {
             max-width: 150px;
             max-height: 150px;
             border-radius: 5px;
             cursor: pointer;
             transition: transform 0.3s ease;
-        }}
+        }
         
-        .image-preview:hover {{
+        .image-preview:hover {
             transform: scale(1.05);
-        }}
+        }
         
-        .filter-buttons {{
+        .filter-buttons {
             margin-bottom: 20px;
             display: flex;
             gap: 10px;
             flex-wrap: wrap;
-        }}
+        }
         
-        .filter-btn {{
+        .filter-btn {
             padding: 10px 20px;
             border: 2px solid #667eea;
             background: white;
@@ -224,49 +377,49 @@ def generate_html_report(
             cursor: pointer;
             transition: all 0.3s ease;
             font-weight: 600;
-        }}
+        }
         
-        .filter-btn:hover, .filter-btn.active {{
+        .filter-btn:hover, .filter-btn.active {
             background: #667eea;
             color: white;
-        }}
+        }
         
-        .error-section {{
+        .error-section {
             background: #fff3cd;
             border-left: 4px solid #ffc107;
             padding: 20px;
             margin: 20px 0;
             border-radius: 5px;
-        }}
+        }
         
-        .error-section h3 {{
+        .error-section h3 {
             color: #856404;
             margin-bottom: 10px;
-        }}
+        }
         
-        footer {{
+        footer {
             background: #f8f9fa;
             padding: 30px;
             text-align: center;
             color: #666;
-        }}
+        }
         
-        .config-box {{
+        .config-box {
             background: #f8f9fa;
             padding: 20px;
             border-radius: 8px;
             margin-top: 20px;
             font-family: 'Courier New', monospace;
             font-size: 0.9em;
-        }}
+        }
         
-        .config-box pre {{
+        .config-box pre {
             white-space: pre-wrap;
             word-wrap: break-word;
-        }}
+        }
     </style>
     <script>
-        function filterResults(filterType) {{
+        function filterResults(filterType) {
             const rows = document.querySelectorAll('.results-table tbody tr');
             const buttons = document.querySelectorAll('.filter-btn');
             
@@ -275,37 +428,128 @@ def generate_html_report(
             event.target.classList.add('active');
             
             // 过滤行
-            rows.forEach(row => {{
+            rows.forEach(row => {
                 const status = row.dataset.status;
-                if (filterType === 'all' || status === filterType) {{
+                if (filterType === 'all' || status === filterType) {
                     row.style.display = '';
-                }} else {{
+                } else {
                     row.style.display = 'none';
-                }}
-            }});
-        }}
+                }
+            });
+        }
         
-        function sortTable(columnIndex) {{
+        function sortTable(columnIndex) {
             const table = document.querySelector('.results-table tbody');
             const rows = Array.from(table.querySelectorAll('tr'));
             
-            rows.sort((a, b) => {{
+            rows.sort((a, b) => {
                 const aText = a.children[columnIndex].textContent.trim();
                 const bText = b.children[columnIndex].textContent.trim();
                 return aText.localeCompare(bText, 'zh-CN');
-            }});
+            });
             
             rows.forEach(row => table.appendChild(row));
-        }}
+        }
     </script>
 </head>
-<body>
+""".encode('utf-8')
+
+# 结果表格行模板(UTF-8字节串)，循环内通过bytes的%格式化填充，写文件时无需再逐行编码
+RESULT_ROW_TEMPLATE = """
+                    <tr data-status="%(status)b">
+                        <td>%(status_icon)b</td>
+                        <td title="%(image_name)b">%(image_name_short)b...</td>
+                        <td>%(ground_truth)b</td>
+                        <td class="answer-cell" title="%(predicted)b">%(predicted)b</td>
+                        <td>
+                            %(confidence).2f
+                            <div class="confidence-bar">
+                                <div class="confidence-fill" style="width: %(confidence_pct)r%%;"></div>
+                            </div>
+                        </td>
+                        <td>%(processing_time).1f</td>
+                        <td>%(retry_count)d</td>
+                    </tr>
+""".encode('utf-8')
+RESULT_ROW_TEMPLATE_WITH_IMAGE = RESULT_ROW_TEMPLATE.replace(
+    b'<td>%(retry_count)d</td>\n',
+    b'<td>%(retry_count)d</td>\n                        <td>%(image_preview)b</td>\n'
+)
+
+IMAGE_PREVIEW_TEMPLATE = b'<img src="%b" class="image-preview" alt="%b" loading="lazy">'
+
+def _render_image_preview(result: Dict[str, Any], image_sources: Dict[str, str]) -> bytes:
+    """生成单行的图像预览标签，无可用图像时返回空串"""
+    image_src = image_sources.get(result.get('image_path'))
+    if not image_src:
+        return b''
+    image_name = escape_html_bytes(str(result.get('image_name', 'N/A')))
+    return IMAGE_PREVIEW_TEMPLATE % (escape_html_bytes(image_src), image_name)
+
+# 各状态对应的(状态名, 状态图标)字节串
+STATUS_MARKUP = {
+    status: (status.encode('utf-8'), f'<span class="status-icon status-{status}">{icon}</span>'.encode('utf-8'))
+    for status, icon in (('failed', '⚠'), ('correct', '✓'), ('incorrect', '✗'), ('unknown', '?'))
+}
+
+def _format_row(row_template: bytes, row_fields: Tuple[Any, ...], image_preview: bytes) -> bytes:
+    """按行模板渲染单条结果，参数与返回值类型固定，便于单独编译"""
+    (success, correct, raw_image_name, ground_truth, predicted_answer, error,
+     confidence, processing_time, retry_count) = row_fields
+    # 确定状态
+    if not success:
+        status, status_icon = STATUS_MARKUP['failed']
+    elif correct is True:
+        status, status_icon = STATUS_MARKUP['correct']
+    elif correct is False:
+        status, status_icon = STATUS_MARKUP['incorrect']
+    else:
+        status, status_icon = STATUS_MARKUP['unknown']
+    
+    raw_image_name = str(raw_image_name)
+    return row_template % {
+        b'status': status,
+        b'status_icon': status_icon,
+        b'image_name': escape_html_bytes(raw_image_name),
+        b'image_name_short': escape_html_bytes(raw_image_name[:30]),
+        b'ground_truth': escape_html_bytes(str(ground_truth or 'N/A')),
+        b'predicted': escape_html_bytes(str(predicted_answer or error)),
+        b'confidence': confidence,
+        b'confidence_pct': confidence * 100,
+        b'processing_time': processing_time,
+        b'retry_count': retry_count,
+        b'image_preview': image_preview
+    }
+
+def _iter_html_fragments(
+    results: List[Dict[str, Any]], 
+    metrics: Dict[str, Any],
+    include_images: bool = False,
+    image_sources: Optional[Dict[str, str]] = None,
+    max_rows: Optional[int] = None
+) -> Iterator[bytes]:
+    """按顺序逐段生成HTML报告内容(UTF-8字节串)"""
+    
+    n_correct, n_incorrect, n_unknown, n_failed, failed_results, incorrect_results = \
+        _summarize_results(results)
+    
+    image_sources = image_sources or {}
+    # 统计与错误分析基于全部结果，详细结果表格最多渲染max_rows行
+    table_results = results[:max_rows] if max_rows is not None else results
+    
+    # 报告中用到的指标只取一次
+    timestamp = metrics.get('timestamp', 'N/A')
+    accuracy = metrics.get('accuracy')
+    accuracy_str = f"{accuracy}%" if accuracy is not None else 'N/A'
+    
+    yield REPORT_HEAD
+    yield f"""<body>
     <div class="container">
         <header>
             <h1>🔍 洗衣机旋钮识别评估报告</h1>
             <div class="subtitle">Bbox增强 - 三阶段CoT推理</div>
             <div class="subtitle" style="margin-top: 10px; opacity: 0.8;">
-                生成时间: {metrics.get('timestamp', 'N/A')}
+                生成时间: {timestamp}
             </div>
         </header>
         
@@ -327,7 +571,7 @@ def generate_html_report(
             <div class="metric-card accuracy">
                 <div class="label">识别准确率</div>
                 <div class="value">
-                    {metrics.get('accuracy', 'N/A') if metrics.get('accuracy') is not None else 'N/A'}{'%' if metrics.get('accuracy') is not None else ''}
+                    {accuracy_str}
                 </div>
                 <div style="font-size: 0.9em; color: #666; margin-top: 5px;">
                     {metrics.get('correct_predictions', 0)}/{metrics.get('samples_with_gt', 0)} 有GT
@@ -357,16 +601,16 @@ def generate_html_report(
             <div class="filter-buttons">
                 <button class="filter-btn active" onclick="filterResults('all')">全部 ({len(results)})</button>
                 <button class="filter-btn" onclick="filterResults('correct')">
-                    ✓ 正确 ({sum(1 for r in results if r.get('correct') is True)})
+                    ✓ 正确 ({n_correct})
                 </button>
                 <button class="filter-btn" onclick="filterResults('incorrect')">
-                    ✗ 错误 ({sum(1 for r in results if r.get('correct') is False)})
+                    ✗ 错误 ({n_incorrect})
                 </button>
                 <button class="filter-btn" onclick="filterResults('unknown')">
-                    ? 未知 ({sum(1 for r in results if r.get('correct') is None and r.get('success'))})
+                    ? 未知 ({n_unknown})
                 </button>
                 <button class="filter-btn" onclick="filterResults('failed')">
-                    ⚠ 失败 ({sum(1 for r in results if not r.get('success'))})
+                    ⚠ 失败 ({n_failed})
                 </button>
             </div>
             
@@ -384,144 +628,205 @@ def generate_html_report(
                     </tr>
                 </thead>
                 <tbody>
-"""
+""".encode('utf-8')
+    
+    # 结果行模板在循环外选定一次；无图模式下循环中不做任何图像相关查找
+    if include_images:
+        row_template = RESULT_ROW_TEMPLATE_WITH_IMAGE
+        image_previews = [_render_image_preview(r, image_sources) for r in table_results]
+    else:
+        row_template = RESULT_ROW_TEMPLATE
+        image_previews = itertools.repeat(b'')
     
     # 添加结果行
-    for result in results:
-        success = result.get('success', False)
-        correct = result.get('correct')
-        
-        # 确定状态
-        if not success:
-            status = 'failed'
-            status_icon = '<span class="status-icon status-failed">⚠</span>'
-        elif correct is True:
-            status = 'correct'
-            status_icon = '<span class="status-icon status-correct">✓</span>'
-        elif correct is False:
-            status = 'incorrect'
-            status_icon = '<span class="status-icon status-incorrect">✗</span>'
-        else:
-            status = 'unknown'
-            status_icon = '<span class="status-icon status-unknown">?</span>'
-        
-        image_name = result.get('image_name', 'N/A')
-        ground_truth = result.get('ground_truth', 'N/A') or 'N/A'
-        predicted = result.get('predicted_answer', 'N/A') or result.get('error', 'Error')
-        confidence = result.get('confidence', 0)
-        processing_time = result.get('processing_time', 0)
-        retry_count = result.get('retry_count', 0)
-        
-        # 图像预览
-        image_preview = ''
-        if include_images and result.get('image_path'):
-            img_base64 = image_to_base64(result['image_path'])
-            if img_base64:
-                image_preview = f'<img src="data:image/png;base64,{img_base64}" class="image-preview" alt="{image_name}">'
-        
-        html_content += f"""
-                    <tr data-status="{status}">
-                        <td>{status_icon}</td>
-                        <td title="{image_name}">{image_name[:30]}...</td>
-                        <td>{ground_truth}</td>
-                        <td class="answer-cell" title="{predicted}">{predicted}</td>
-                        <td>
-                            {confidence:.2f}
-                            <div class="confidence-bar">
-                                <div class="confidence-fill" style="width: {confidence*100}%;"></div>
-                            </div>
+    for row_fields, image_preview in zip(_extract_row_fields(table_results), image_previews):
+        yield _format_row(row_template, row_fields, image_preview)
+    
+    num_omitted = len(results) - len(table_results)
+    if num_omitted > 0:
+        yield f"""
+                    <tr data-status="all">
+                        <td colspan="{8 if include_images else 7}" style="text-align: center; color: #666;">
+                            仅显示前 {len(table_results)} 条结果，其余 {num_omitted} 条未渲染
                         </td>
-                        <td>{processing_time:.1f}</td>
-                        <td>{retry_count}</td>
-                        {'<td>' + image_preview + '</td>' if include_images else ''}
                     </tr>
-"""
+""".encode('utf-8')
     
-    html_content += """
+    yield """
                 </tbody>
             </table>
         </div>
-"""
+""".encode('utf-8')
     
     # 错误分析
-    failed_results = [r for r in results if not r.get('success')]
-    incorrect_results = [r for r in results if r.get('correct') is False]
-    
     if failed_results or incorrect_results:
-        html_content += """
+        yield """
         <div class="section">
             <h2 class="section-title">错误分析</h2>
-"""
+""".encode('utf-8')
         
         if failed_results:
-            html_content += f"""
+            yield f"""
             <div class="error-section">
                 <h3>⚠ 处理失败 ({len(failed_results)} 个)</h3>
                 <ul>
-"""
+""".encode('utf-8')
             for r in failed_results[:10]:  # 只显示前10个
-                html_content += f"                    <li><strong>{r.get('image_name', 'N/A')}</strong>: {r.get('error', 'Unknown error')}</li>\n"
+                yield f"                    <li><strong>{escape_html(str(r.get('image_name', 'N/A')))}</strong>: {escape_html(str(r.get('error', 'Unknown error')))}</li>\n".encode('utf-8')
             
             if len(failed_results) > 10:
-                html_content += f"                    <li><em>... 还有 {len(failed_results) - 10} 个失败样本</em></li>\n"
+                yield f"                    <li><em>... 还有 {len(failed_results) - 10} 个失败样本</em></li>\n".encode('utf-8')
             
-            html_content += """
+            yield """
                 </ul>
             </div>
-"""
+""".encode('utf-8')
         
         if incorrect_results:
-            html_content += f"""
+            yield f"""
             <div class="error-section">
                 <h3>✗ 识别错误 ({len(incorrect_results)} 个)</h3>
                 <ul>
-"""
+""".encode('utf-8')
             for r in incorrect_results[:10]:  # 只显示前10个
-                html_content += f"""                    <li>
-                        <strong>{r.get('image_name', 'N/A')}</strong>: 
-                        预测={r.get('predicted_answer', 'N/A')}, 
-                        GT={r.get('ground_truth', 'N/A')}, 
+                yield f"""                    <li>
+                        <strong>{escape_html(str(r.get('image_name', 'N/A')))}</strong>: 
+                        预测={escape_html(str(r.get('predicted_answer', 'N/A')))}, 
+                        GT={escape_html(str(r.get('ground_truth', 'N/A')))}, 
                         置信度={r.get('confidence', 0):.2f}
-                    </li>\n"""
+                    </li>\n""".encode('utf-8')
             
             if len(incorrect_results) > 10:
-                html_content += f"                    <li><em>... 还有 {len(incorrect_results) - 10} 个错误样本</em></li>\n"
+                yield f"                    <li><em>... 还有 {len(incorrect_results) - 10} 个错误样本</em></li>\n".encode('utf-8')
             
-            html_content += """
+            yield """
                 </ul>
             </div>
-"""
+""".encode('utf-8')
         
-        html_content += """
+        yield """
         </div>
-"""
+""".encode('utf-8')
     
     # 配置信息
     config = metrics.get('config', {})
-    config_json = json.dumps(config, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        config_json = orjson.dumps(
+            config,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+    else:
+        config_json = json.dumps(config, indent=2, ensure_ascii=False)
     
-    html_content += f"""
+    yield f"""
         <div class="section">
             <h2 class="section-title">配置信息</h2>
             <div class="config-box">
-                <pre>{config_json}</pre>
+                <pre>{html.escape(config_json, quote=False)}</pre>
             </div>
         </div>
         
         <footer>
             <p><strong>TSVR-CoT</strong> - Three-Stage Visual Reasoning with Chain-of-Thought</p>
             <p style="margin-top: 10px; font-size: 0.9em;">
-                生成于 {metrics.get('timestamp', 'N/A')}
+                生成于 {timestamp}
             </p>
         </footer>
     </div>
 </body>
 </html>
-"""
+""".encode('utf-8')
+    
+@lru_cache(maxsize=1)
+def _report_code_salt() -> bytes:
+    """缓存键的版本盐: 版本号加本脚本源码(含HTML模板)的摘要，修改模板或渲染代码后旧缓存自动失效"""
+    source = Path(__file__).read_bytes()
+    return f"v{REPORT_CACHE_VERSION}:".encode('utf-8') + hashlib.blake2b(source, digest_size=16).digest()
+
+def _report_cache_key(
+    results: List[Dict[str, Any]],
+    metrics: Dict[str, Any],
+    options: Tuple[Any, ...],
+    image_paths: List[str]
+) -> str:
+    """根据报告的全部输入及生成代码版本计算缓存键"""
+    dumps = orjson.dumps if orjson is not None else (lambda obj: json.dumps(obj, default=str).encode('utf-8'))
+    hasher = xxhash.xxh3_64() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    hasher.update(_report_code_salt())
+    hasher.update(dumps(results))
+    hasher.update(dumps(metrics))
+    hasher.update(repr(options).encode('utf-8'))
+    # 内嵌图像时报告内容还取决于图像文件本身
+    for image_path in sorted(image_paths):
+        try:
+            stat = os.stat(image_path)
+            hasher.update(f"{image_path}:{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'))
+        except OSError:
+            hasher.update(image_path.encode('utf-8'))
+    return hasher.hexdigest()
+
+def generate_html_report(
+    results: List[Dict[str, Any]], 
+    metrics: Dict[str, Any],
+    output_path: str,
+    include_images: bool = False,
+    image_mode: str = 'link',
+    max_rows: Optional[int] = None,
+    cache_dir: Optional[str] = None
+) -> None:
+    """
+    生成HTML报告
+    
+    Args:
+        image_mode: 图像预览方式，link为链接到报告旁images目录中的图像，inline为内嵌base64缩略图
+        max_rows: 详细结果表格最多渲染的行数，None表示全部渲染
+        cache_dir: 报告缓存目录，输入完全相同时直接复制缓存的报告，None表示不使用缓存
+    """
+    image_paths: List[str] = []
+    if include_images:
+        table_results = results[:max_rows] if max_rows is not None else results
+        image_paths = list({r['image_path'] for r in table_results if r.get('image_path')})
+    
+    # 链接模式下每次都要保证images目录存在，链接开销很小
+    image_sources: Dict[str, str] = {}
+    if include_images and image_mode == 'link':
+        images_dir = Path(output_path).parent / 'images'
+        image_sources = link_images(image_paths, images_dir)
+    
+    compressed = output_path.endswith('.gz')
+    cache_path = None
+    if cache_dir:
+        options = (include_images, image_mode, max_rows, compressed)
+        cache_key = _report_cache_key(
+            results, metrics, options, image_paths if include_images and image_mode == 'inline' else []
+        )
+        cache_path = Path(cache_dir) / f"{cache_key}{'.html.gz' if compressed else '.html'}"
+        if cache_path.is_file():
+            shutil.copyfile(cache_path, output_path)
+            print(f"HTML报告已生成(缓存): {output_path}")
+            return
+    
+    # 图像预览: 对表格中出现的路径去重后统一准备图像来源
+    if include_images and image_mode != 'link':
+        # 内嵌模式用线程池并发读取编码
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            encoded = executor.map(image_to_base64, image_paths)
+            image_sources = {
+                path: f"data:image/webp;base64,{img_base64}"
+                for path, img_base64 in zip(image_paths, encoded) if img_base64
+            }
+    
+    # 各片段直接写入文件，不在内存中拼出完整文档；.gz后缀时边生成边压缩
+    if compressed:
+        f = gzip.open(output_path, 'wb', compresslevel=6)
+    else:
+        f = open(output_path, 'wb', buffering=1 << 20)
+    with f:
+        f.writelines(_iter_html_fragments(results, metrics, include_images, image_sources, max_rows))
     
-    # 写入文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(output_path, cache_path)
     
     print(f"HTML报告已生成: {output_path}")
 
@@ -529,8 +834,15 @@ def main():
     parser = argparse.ArgumentParser(description='生成评估HTML报告')
     parser.add_argument('--results', type=str, required=True, help='results.jsonl文件路径')
     parser.add_argument('--metrics', type=str, required=True, help='eval_report.json文件路径')
-    parser.add_argument('--output', type=str, required=True, help='输出HTML文件路径')
+    parser.add_argument('--output', type=str, required=True, help='输出HTML文件路径(以.gz结尾时输出gzip压缩文件)')
     parser.add_argument('--include-images', action='store_true', help='是否在报告中包含图像预览')
+    parser.add_argument('--image-mode', type=str, choices=['inline', 'link', 'none'], default='link',
+                        help='图像预览方式: link链接到报告旁images目录, inline内嵌base64, none不显示')
+    parser.add_argument('--max-rows', type=int, default=None,
+                        help='详细结果表格最多显示的行数(默认全部显示)')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='报告缓存目录，输入相同时直接复用已生成的报告(默认不缓存)。'
+                             '缓存不会自动清理，直接删除该目录即可清空')
     
     args = parser.parse_args()
     
@@ -539,7 +851,9 @@ def main():
     metrics = load_metrics(args.metrics)
     
     # 生成报告
-    generate_html_report(results, metrics, args.output, args.include_images)
+    include_images = args.include_images and args.image_mode != 'none'
+    generate_html_report(results, metrics, args.output, include_images, args.image_mode, args.max_rows,
+                         args.cache_dir or None)
 
 if __name__ == '__main__':
     main()
@@ -7,15 +7,26 @@ import json
 import argparse
 import logging
 import datetime
+import bisect
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from collections import Counter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
 import numpy as np
 import base64
 from io import BytesIO
+from urllib.parse import quote
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # Fall back to the standard library parser
+    orjson = None
+    _json_loads = json.loads
 
 # Setup logging
 logging.basicConfig(
@@ -24,6 +35,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Image reads are latency-bound rather than CPU-bound, so use more threads than cores
+DEFAULT_IO_WORKERS = 32
+
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Generate Washing Machine Knob State Recognition HTML Report')
@@ -42,6 +56,13 @@ def parse_args():
         help='Output HTML file path'
     )
     
+    parser.add_argument(
+        '--stats_json',
+        type=str,
+        default='',
+        help='Optional path to also save the computed statistics as JSON'
+    )
+    
     parser.add_argument(
         '--image_dir',
         type=str,
@@ -56,6 +77,22 @@ def parse_args():
         help='Intermediate image directory (for displaying reasoning process)'
     )
     
+    parser.add_argument(
+        '--inline_images',
+        type=str,
+        choices=['auto', 'always', 'never'],
+        default='auto',
+        help='Embed card images as base64 (always), link them by relative path (never), '
+             'or link only images inside the report directory (auto)'
+    )
+    
+    parser.add_argument(
+        '--io_workers',
+        type=int,
+        default=DEFAULT_IO_WORKERS,
+        help='Number of threads reading images concurrently (raise for high-latency storage)'
+    )
+    
     parser.add_argument(
         '--debug',
         action='store_true',
@@ -72,192 +109,245 @@ def load_results(jsonl_path: str) -> List[Dict[str, Any]]:
             logger.warning(f"Results file does not exist: {jsonl_path}")
             return results
             
-        with open(jsonl_path, 'r', encoding='utf-8') as f:
+        # Read raw bytes; orjson parses them without a separate UTF-8 decode step
+        with open(jsonl_path, 'rb', buffering=1 << 20) as f:
             for line in f:
                 if line.strip():
                     try:
-                        results.append(json.loads(line))
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"JSON parsing error: {e}, skipping line: {line.strip()}")
+                        results.append(_json_loads(line))
+                    except ValueError as e:  # json/orjson JSONDecodeError
+                        logger.warning(f"JSON parsing error: {e}, skipping line: {line.strip().decode('utf-8', 'replace')}")
         logger.info(f"Successfully loaded {len(results)} results")
     except Exception as e:
         logger.error(f"Failed to load results file: {e}")
         logger.error(f"Stack trace:\n{e.__traceback__}")
     return results
 
-def generate_statistics(results: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Generate statistics"""
-    stats = {
-        'total_count': len(results),
-        'success_count': sum(1 for r in results if r.get('success', False)),
-        'failure_count': sum(1 for r in results if not r.get('success', False)),
-        'avg_confidence': 0.0,
-        'answer_distribution': Counter(),
-        'processing_time_stats': {},
-        'error_types': Counter()
-    }
+def read_image_b64(path: str) -> str:
+    """Return the base64 encoding of an image file"""
+    # No cache here: the report prefetch already encodes each unique path once per run
+    return base64.b64encode(Path(path).read_bytes()).decode('ascii')
+
+@dataclass
+class ReportStats:
+    """Summary statistics of a result set; the defaults describe an empty one"""
+    total_count: int = 0
+    success_count: int = 0
+    failure_count: int = 0
+    avg_confidence: float = 0.0
+    answer_distribution: Counter = field(default_factory=Counter)
+    processing_time_stats: Dict[str, float] = field(default_factory=dict)
+    error_types: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view with the Counters converted, ready for JSON serialization"""
+        # orjson only serializes plain dicts, so convert the Counters first
+        # (dataclasses.asdict would rebuild a Counter from its item pairs)
+        values = ((f.name, getattr(self, f.name)) for f in fields(self))
+        return {key: dict(value) if isinstance(value, Counter) else value for key, value in values}
+
+def generate_statistics(results: List[Dict[str, Any]]) -> ReportStats:
+    """Generate statistics in a single pass over the results"""
+    if not results:
+        return ReportStats()
     
-    # Calculate average confidence
-    confidences = [r.get('confidence', 0.0) for r in results if r.get('success', False)]
-    if confidences:
-        stats['avg_confidence'] = sum(confidences) / len(confidences)
+    success_count = 0
+    confidences = []
+    processing_times = []
+    answer_distribution = Counter()
+    error_types = Counter()
     
-    # Answer distribution
     for result in results:
         if result.get('success', False):
-            final_answer = result.get('final_answer', 'Unknown').strip()
-            stats['answer_distribution'][final_answer] += 1
+            success_count += 1
+            confidences.append(result.get('confidence', 0.0))
+            processing_times.append(result.get('processing_time', 0))
+            answer_distribution[result.get('final_answer', 'Unknown').strip()] += 1
+        else:
+            error = result.get('error')
+            if error:
+                error_types[error.partition(':')[0].strip()] += 1
+    
+    stats = ReportStats(
+        total_count=len(results),
+        success_count=success_count,
+        failure_count=len(results) - success_count,
+        answer_distribution=answer_distribution,
+        error_types=error_types
+    )
+    
+    # Calculate average confidence
+    if confidences:
+        stats.avg_confidence = float(np.fromiter(confidences, dtype=np.float64, count=success_count).mean())
     
     # Processing time statistics
-    processing_times = [r.get('processing_time', 0) for r in results if r.get('success', False)]
     if processing_times:
-        stats['processing_time_stats'] = {
-            'min': min(processing_times),
-            'max': max(processing_times),
-            'avg': sum(processing_times) / len(processing_times),
-            'median': sorted(processing_times)[len(processing_times) // 2]
+        times = np.fromiter(processing_times, dtype=np.float64, count=success_count)
+        # Upper median via introselect (O(n)) instead of a full sort
+        median_index = len(times) // 2
+        stats.processing_time_stats = {
+            'min': float(times.min()),
+            'max': float(times.max()),
+            'avg': float(times.mean()),
+            'median': float(np.partition(times, median_index)[median_index])
         }
     
-    # Error type statistics
-    for result in results:
-        if not result.get('success', False) and result.get('error'):
-            error_type = result['error'].split(':')[0].strip()
-            stats['error_types'][error_type] += 1
-    
     return stats
 
-def create_confidence_chart(confidences: List[float], output_path: str):
-    """Create confidence distribution chart"""
+def dump_stats(stats: ReportStats, path: str) -> None:
+    """Write statistics to a JSON file"""
+    serializable = stats.to_dict()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(serializable, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+    else:
+        Path(path).write_text(json.dumps(serializable, indent=2, ensure_ascii=False), encoding='utf-8')
+
+def _figure_to_base64(fig) -> str:
+    """Render a figure into memory and return its SVG as base64"""
+    # SVG skips Agg rasterization and PNG compression; drop the date so output is reproducible
+    buffer = BytesIO()
+    # A fixed hash salt keeps the generated element ids stable between runs
+    with plt.rc_context({'svg.hashsalt': 'tsvr-report'}):
+        fig.savefig(buffer, format='svg', bbox_inches='tight', metadata={'Date': None})
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def _reset_axes(ax, figsize):
+    """Clear a shared Axes and restore figure size and default margins before drawing a new chart"""
+    ax.clear()
+    fig = ax.figure
+    fig.set_size_inches(*figsize)
+    # Undo any tight_layout() margins applied by a previous chart
+    fig.subplots_adjust(**{
+        side: plt.rcParams[f'figure.subplot.{side}']
+        for side in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+    })
+
+# Layout of the hand-built confidence histogram SVG (user units)
+_HIST_WIDTH, _HIST_HEIGHT = 720, 430
+_HIST_LEFT, _HIST_RIGHT, _HIST_TOP, _HIST_BOTTOM = 70, 20, 45, 60
+_HIST_BINS = 10
+
+def create_confidence_chart(confidences: List[float]):
+    """Create confidence distribution chart as a hand-built SVG histogram (no matplotlib)"""
     try:
-        plt.figure(figsize=(10, 6))
-        
-        # Draw histogram
-        plt.hist(confidences, bins=10, alpha=0.7, color='skyblue', edgecolor='black')
-        
-        # Add average line
-        avg_conf = sum(confidences) / len(confidences) if confidences else 0
-        plt.axvline(x=avg_conf, color='red', linestyle='--', label=f'Average Confidence: {avg_conf:.2f}')
-        
-        plt.title('Confidence Distribution', fontsize=14)
-        plt.xlabel('Confidence Score', fontsize=12)
-        plt.ylabel('Sample Count', fontsize=12)
-        plt.grid(alpha=0.3)
-        plt.legend()
-        
-        # Save chart
-        plt.savefig(output_path, dpi=100, bbox_inches='tight')
-        plt.close()
-        
-        # Convert to base64
-        with open(output_path, 'rb') as f:
-            img_base64 = base64.b64encode(f.read()).decode('utf-8')
+        values = np.clip(np.asarray(confidences, dtype=np.float64), 0.0, 1.0)
+        counts, _ = np.histogram(values, bins=_HIST_BINS, range=(0.0, 1.0))
+        avg_conf = float(values.mean()) if values.size else 0.0
+        
+        plot_w = _HIST_WIDTH - _HIST_LEFT - _HIST_RIGHT
+        plot_h = _HIST_HEIGHT - _HIST_TOP - _HIST_BOTTOM
+        bottom = _HIST_TOP + plot_h
+        y_max = max(int(counts.max()), 1)
+        bar_w = plot_w / _HIST_BINS
+        
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_HIST_WIDTH} {_HIST_HEIGHT}" '
+            f'width="{_HIST_WIDTH}" height="{_HIST_HEIGHT}" font-family="DejaVu Sans, Arial, sans-serif">',
+            f'<rect width="{_HIST_WIDTH}" height="{_HIST_HEIGHT}" fill="white"/>',
+            f'<text x="{_HIST_LEFT + plot_w / 2:.1f}" y="28" font-size="18" text-anchor="middle">Confidence Distribution</text>'
+        ]
+        
+        # Horizontal grid lines and y-axis labels
+        for tick in range(0, y_max + 1, -(-y_max // 5)):
+            y = bottom - tick / y_max * plot_h
+            parts.append(f'<line x1="{_HIST_LEFT}" y1="{y:.1f}" x2="{_HIST_LEFT + plot_w}" y2="{y:.1f}" stroke="#ddd"/>')
+            parts.append(f'<text x="{_HIST_LEFT - 8}" y="{y + 4:.1f}" font-size="12" text-anchor="end">{tick}</text>')
+        
+        # Histogram bars
+        for i, count in enumerate(counts.tolist()):
+            bar_h = count / y_max * plot_h
+            parts.append(
+                f'<rect x="{_HIST_LEFT + i * bar_w:.1f}" y="{bottom - bar_h:.1f}" width="{bar_w:.1f}" height="{bar_h:.1f}" '
+                f'fill="skyblue" fill-opacity="0.7" stroke="black"/>'
+            )
         
-        return img_base64
+        # X-axis labels
+        for i in range(0, _HIST_BINS + 1, 2):
+            x = _HIST_LEFT + i * bar_w
+            parts.append(f'<text x="{x:.1f}" y="{bottom + 20}" font-size="12" text-anchor="middle">{i / _HIST_BINS:.1f}</text>')
+        
+        # Axes, average line and legend
+        avg_x = _HIST_LEFT + avg_conf * plot_w
+        parts += [
+            f'<line x1="{_HIST_LEFT}" y1="{bottom}" x2="{_HIST_LEFT + plot_w}" y2="{bottom}" stroke="black"/>',
+            f'<line x1="{_HIST_LEFT}" y1="{_HIST_TOP}" x2="{_HIST_LEFT}" y2="{bottom}" stroke="black"/>',
+            f'<line x1="{avg_x:.1f}" y1="{_HIST_TOP}" x2="{avg_x:.1f}" y2="{bottom}" stroke="red" stroke-width="1.5" stroke-dasharray="6,4"/>',
+            f'<text x="{_HIST_LEFT + plot_w / 2:.1f}" y="{_HIST_HEIGHT - 15}" font-size="14" text-anchor="middle">Confidence Score</text>',
+            f'<text x="18" y="{_HIST_TOP + plot_h / 2:.1f}" font-size="14" text-anchor="middle" '
+            f'transform="rotate(-90 18 {_HIST_TOP + plot_h / 2:.1f})">Sample Count</text>',
+            f'<line x1="{_HIST_LEFT + plot_w - 215}" y1="{_HIST_TOP + 15}" x2="{_HIST_LEFT + plot_w - 185}" y2="{_HIST_TOP + 15}" '
+            f'stroke="red" stroke-width="1.5" stroke-dasharray="6,4"/>',
+            f'<text x="{_HIST_LEFT + plot_w - 178}" y="{_HIST_TOP + 19}" font-size="12">Average Confidence: {avg_conf:.2f}</text>',
+            '</svg>'
+        ]
+        
+        return base64.b64encode(''.join(parts).encode('utf-8')).decode('ascii')
     except Exception as e:
         logger.error(f"Failed to create confidence chart: {e}")
         return None
 
-def create_answer_distribution_chart(distribution: Counter, output_path: str):
-    """Create answer distribution chart"""
+def create_answer_distribution_chart(distribution: Counter, ax):
+    """Create answer distribution chart on a shared, reusable Axes"""
     try:
         if not distribution:
             return None
         
         # Show only top 10 most common answers
-        top_answers = dict(distribution.most_common(10))
+        answers, counts = zip(*distribution.most_common(10))
         
-        plt.figure(figsize=(12, 8))
+        _reset_axes(ax, (12, 8))
         
         # Create bar chart
-        answers = list(top_answers.keys())
-        counts = list(top_answers.values())
-        
         y_pos = range(len(answers))
-        plt.barh(y_pos, counts, color='lightgreen', edgecolor='black', alpha=0.8)
+        ax.barh(y_pos, counts, color='lightgreen', edgecolor='black', alpha=0.8)
         
         # Use index numbers for answers to avoid Chinese font issues
-        plt.yticks(y_pos, [f"Mode {i+1}" for i in range(len(answers))], fontsize=10)
-        plt.xlabel('Frequency', fontsize=12)
-        plt.title('Answer Distribution (Top 10)', fontsize=14)
-        plt.grid(axis='x', alpha=0.3)
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels([f"Mode {i+1}" for i in range(len(answers))], fontsize=10)
+        ax.set_xlabel('Frequency', fontsize=12)
+        ax.set_title('Answer Distribution (Top 10)', fontsize=14)
+        ax.grid(axis='x', alpha=0.3)
         
         # Add value labels on bars
         for i, count in enumerate(counts):
-            plt.text(count + 0.5, i, str(count), va='center')
-        
-        plt.tight_layout()
+            ax.text(count + 0.5, i, str(count), va='center')
         
-        # Save chart
-        plt.savefig(output_path, dpi=100, bbox_inches='tight')
-        plt.close()
+        ax.figure.tight_layout()
         
-        # Convert to base64
-        with open(output_path, 'rb') as f:
-            img_base64 = base64.b64encode(f.read()).decode('utf-8')
-        
-        return img_base64
+        return _figure_to_base64(ax.figure)
     except Exception as e:
         logger.error(f"Failed to create answer distribution chart: {e}")
         return None
 
-def create_processing_time_chart(times: List[float], output_path: str):
-    """Create processing time chart"""
+def create_processing_time_chart(times: List[float], ax):
+    """Create processing time chart on a shared, reusable Axes"""
     try:
         if not times:
             return None
         
-        plt.figure(figsize=(10, 6))
+        _reset_axes(ax, (10, 6))
         
         # Create line chart
-        plt.plot(range(1, len(times) + 1), times, 'b-', marker='o', markersize=4, alpha=0.7)
+        ax.plot(range(1, len(times) + 1), times, 'b-', marker='o', markersize=4, alpha=0.7)
         
         # Add average line
         avg_time = sum(times) / len(times)
-        plt.axhline(y=avg_time, color='red', linestyle='--', label=f'Average Time: {avg_time:.2f}s')
-        
-        plt.title('Processing Time Trend', fontsize=14)
-        plt.xlabel('Sample Index', fontsize=12)
-        plt.ylabel('Time (seconds)', fontsize=12)
-        plt.grid(alpha=0.3)
-        plt.legend()
-        
-        # Save chart
-        plt.savefig(output_path, dpi=100, bbox_inches='tight')
-        plt.close()
+        ax.axhline(y=avg_time, color='red', linestyle='--', label=f'Average Time: {avg_time:.2f}s')
         
-        # Convert to base64
-        with open(output_path, 'rb') as f:
-            img_base64 = base64.b64encode(f.read()).decode('utf-8')
+        ax.set_title('Processing Time Trend', fontsize=14)
+        ax.set_xlabel('Sample Index', fontsize=12)
+        ax.set_ylabel('Time (seconds)', fontsize=12)
+        ax.grid(alpha=0.3)
+        ax.legend()
         
-        return img_base64
+        return _figure_to_base64(ax.figure)
     except Exception as e:
         logger.error(f"Failed to create processing time chart: {e}")
         return None
 
-def generate_html_report(
-    results: List[Dict[str, Any]],
-    stats: Dict[str, Any],
-    output_path: str,
-    image_dir: str = '',
-    intermediate_dir: str = ''
-):
-    """Generate HTML report"""
-    try:
-        # Create temporary directory for charts
-        temp_dir = Path(output_path).parent / 'temp_charts'
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate charts
-        confidences = [r.get('confidence', 0.0) for r in results if r.get('success', False)]
-        confidence_chart = create_confidence_chart(confidences, str(temp_dir / 'confidence_chart.png')) if confidences else None
-        
-        answer_chart = create_answer_distribution_chart(stats['answer_distribution'], str(temp_dir / 'answer_chart.png')) if stats['answer_distribution'] else None
-        
-        processing_times = [r.get('processing_time', 0) for r in results if r.get('success', False)]
-        time_chart = create_processing_time_chart(processing_times, str(temp_dir / 'time_chart.png')) if processing_times else None
-        
-        # Generate HTML content
-        html_content = f"""
+# Static document head (styles), identical for every report
+_REPORT_HEAD = """
         <!DOCTYPE html>
         <html lang="en">
         <head>
@@ -265,7 +355,7 @@ def generate_html_report(
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>Washing Machine Knob State Recognition Report</title>
             <style>
-                body {{
+                body {
                     font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                     line-height: 1.6;
                     color: #333;
@@ -273,8 +363,8 @@ def generate_html_report(
                     margin: 0 auto;
                     padding: 20px;
                     background-color: #f5f7fa;
-                }}
-                .header {{
+                }
+                .header {
                     text-align: center;
                     padding: 20px;
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -282,76 +372,76 @@ def generate_html_report(
                     border-radius: 10px;
                     margin-bottom: 30px;
                     box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                }}
-                .stats-container {{
+                }
+                .stats-container {
                     display: grid;
                     grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
                     gap: 20px;
                     margin-bottom: 30px;
-                }}
-                .stat-card {{
+                }
+                .stat-card {
                     background: white;
                     padding: 20px;
                     border-radius: 8px;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
                     text-align: center;
-                }}
-                .stat-value {{
+                }
+                .stat-value {
                     font-size: 2em;
                     font-weight: bold;
                     color: #667eea;
-                }}
-                .stat-label {{
+                }
+                .stat-label {
                     color: #666;
                     margin-top: 5px;
-                }}
-                .chart-container {{
+                }
+                .chart-container {
                     background: white;
                     padding: 20px;
                     border-radius: 8px;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
                     margin-bottom: 30px;
-                }}
-                .chart-title {{
+                }
+                .chart-title {
                     font-size: 1.2em;
                     margin-bottom: 15px;
                     color: #444;
-                }}
-                .results-container {{
+                }
+                .results-container {
                     display: grid;
                     grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
                     gap: 25px;
-                }}
-                .result-card {{
+                }
+                .result-card {
                     background: white;
                     border-radius: 8px;
                     box-shadow: 0 2px 8px rgba(0,0,0,0.15);
                     overflow: hidden;
                     transition: transform 0.3s ease;
-                }}
-                .result-card:hover {{
+                }
+                .result-card:hover {
                     transform: translateY(-5px);
-                }}
-                .result-header {{
+                }
+                .result-header {
                     padding: 15px;
                     background: #667eea;
                     color: white;
                     font-weight: bold;
-                }}
-                .result-content {{
+                }
+                .result-content {
                     padding: 15px;
-                }}
-                .image-container {{
+                }
+                .image-container {
                     text-align: center;
                     margin: 10px 0;
-                }}
-                .result-image {{
+                }
+                .result-image {
                     max-width: 100%;
                     height: auto;
                     border: 1px solid #ddd;
                     border-radius: 4px;
-                }}
-                .answer-highlight {{
+                }
+                .answer-highlight {
                     font-size: 1.3em;
                     font-weight: bold;
                     color: #28a745;
@@ -359,78 +449,78 @@ def generate_html_report(
                     padding: 8px;
                     background: #e8f5e9;
                     border-radius: 4px;
-                }}
-                .confidence-badge {{
+                }
+                .confidence-badge {
                     display: inline-block;
                     padding: 3px 8px;
                     border-radius: 12px;
                     font-size: 0.9em;
                     font-weight: bold;
                     margin-left: 10px;
-                }}
-                .high-confidence {{
+                }
+                .high-confidence {
                     background: #28a745;
                     color: white;
-                }}
-                .medium-confidence {{
+                }
+                .medium-confidence {
                     background: #ffc107;
                     color: #212529;
-                }}
-                .low-confidence {{
+                }
+                .low-confidence {
                     background: #dc3545;
                     color: white;
-                }}
-                .stages-container {{
+                }
+                .stages-container {
                     margin-top: 15px;
-                }}
-                .stage {{
+                }
+                .stage {
                     margin-bottom: 10px;
                     padding: 10px;
                     border-left: 3px solid #667eea;
                     background: #f8f9fa;
-                }}
-                .stage-title {{
+                }
+                .stage-title {
                     font-weight: bold;
                     margin-bottom: 5px;
                     color: #495057;
-                }}
-                .error-card {{
+                }
+                .error-card {
                     background: #fff0f0;
                     border-left: 3px solid #dc3545;
-                }}
-                .error-message {{
+                }
+                .error-message {
                     color: #dc3545;
                     font-family: monospace;
                     white-space: pre-wrap;
                     max-height: 200px;
                     overflow: auto;
-                }}
-                .footer {{
+                }
+                .footer {
                     text-align: center;
                     margin-top: 40px;
                     padding: 20px;
                     color: #6c757d;
                     font-size: 0.9em;
-                }}
-                .filter-container {{
+                }
+                .filter-container {
                     margin: 20px 0;
                     padding: 15px;
                     background: white;
                     border-radius: 8px;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .filter-controls {{
+                }
+                .filter-controls {
                     display: flex;
                     gap: 15px;
                     flex-wrap: wrap;
-                }}
-                select, input {{
+                }
+                select, input {
                     padding: 8px 12px;
                     border: 1px solid #ddd;
                     border-radius: 4px;
                     background: white;
-                }}
-                button {{
+                }
+                button {
                     background: #667eea;
                     color: white;
                     border: none;
@@ -438,42 +528,115 @@ def generate_html_report(
                     border-radius: 4px;
                     cursor: pointer;
                     transition: background 0.3s;
-                }}
-                button:hover {{
+                }
+                button:hover {
                     background: #5a6fd8;
-                }}
-                @media (max-width: 768px) {{
-                    .results-container {{
+                }
+                @media (max-width: 768px) {
+                    .results-container {
                         grid-template-columns: 1fr;
-                    }}
-                    .stats-container {{
+                    }
+                    .stats-container {
                         grid-template-columns: 1fr;
-                    }}
-                }}
+                    }
+                }
             </style>
-        </head>
+        </head>"""
+
+# Static filter script and document end
+_REPORT_TAIL = """
+
+            <script>
+                function filterResults() {
+                    const minConfidence = parseFloat(document.getElementById('confidence-filter').value);
+                    const successFilter = document.getElementById('success-filter').value;
+                    const searchText = document.getElementById('search-input').value.toLowerCase();
+                    
+                    const cards = document.querySelectorAll('.result-card');
+                    
+                    cards.forEach(card => {
+                        const confidence = parseFloat(card.dataset.confidence || '0');
+                        const isSuccess = card.dataset.success === 'true';
+                        const answer = card.dataset.answer?.toLowerCase() || '';
+                        
+                        let show = true;
+                        
+                        if (confidence < minConfidence) show = false;
+                        if (successFilter === 'success' && !isSuccess) show = false;
+                        if (successFilter === 'failure' && isSuccess) show = false;
+                        if (searchText && !answer.includes(searchText)) show = false;
+                        
+                        card.style.display = show ? 'block' : 'none';
+                    });
+                }
+                
+                function resetFilters() {
+                    document.getElementById('confidence-filter').value = '0.5';
+                    document.getElementById('success-filter').value = 'success';
+                    document.getElementById('search-input').value = '';
+                    filterResults();
+                }
+                
+                // Initial filter
+                document.addEventListener('DOMContentLoaded', filterResults);
+            </script>
+        </body>
+        </html>
+        """
+
+def generate_html_report(
+    results: List[Dict[str, Any]],
+    stats: ReportStats,
+    output_path: str,
+    image_dir: str = '',
+    intermediate_dir: str = '',
+    io_workers: int = DEFAULT_IO_WORKERS,
+    inline_images: str = 'auto'
+):
+    """Generate HTML report"""
+    try:
+        # Generate charts, reusing one Figure/Axes for all of them
+        fig, ax = plt.subplots(figsize=(10, 6))
+        try:
+            confidences = [r.get('confidence', 0.0) for r in results if r.get('success', False)]
+            confidence_chart = create_confidence_chart(confidences) if confidences else None
+            
+            answer_chart = create_answer_distribution_chart(stats.answer_distribution, ax) if stats.answer_distribution else None
+            
+            processing_times = [r.get('processing_time', 0) for r in results if r.get('success', False)]
+            time_chart = create_processing_time_chart(processing_times, ax) if processing_times else None
+        finally:
+            plt.close(fig)
+        
+        generated_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Write the document section by section so the full HTML never exists as one string
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(_REPORT_HEAD)
+            f.write(f"""
         <body>
             <div class="header">
                 <h1>🌀 Washing Machine Knob State Recognition Report</h1>
                 <p>Three-Stage Chain-of-Thought Visual Reasoning System</p>
-                <p>Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p>Generated: {generated_at}</p>
             </div>
 
             <div class="stats-container">
                 <div class="stat-card">
-                    <div class="stat-value">{stats['total_count']}</div>
+                    <div class="stat-value">{stats.total_count}</div>
                     <div class="stat-label">Total Samples</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{stats['success_count']}</div>
+                    <div class="stat-value">{stats.success_count}</div>
                     <div class="stat-label">Successful</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{stats['failure_count']}</div>
+                    <div class="stat-value">{stats.failure_count}</div>
                     <div class="stat-label">Failed</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{stats['avg_confidence']:.2f}</div>
+                    <div class="stat-value">{stats.avg_confidence:.2f}</div>
                     <div class="stat-label">Avg Confidence</div>
                 </div>
             </div>
@@ -481,21 +644,21 @@ def generate_html_report(
             {f'''
             <div class="chart-container">
                 <div class="chart-title">📊 Confidence Distribution</div>
-                <img src="data:image/png;base64,{confidence_chart}" alt="Confidence Distribution" style="max-width: 100%;">
+                <img src="data:image/svg+xml;base64,{confidence_chart}" alt="Confidence Distribution" style="max-width: 100%;">
             </div>
             ''' if confidence_chart else ''}
 
             {f'''
             <div class="chart-container">
                 <div class="chart-title">📈 Answer Distribution (Top 10)</div>
-                <img src="data:image/png;base64,{answer_chart}" alt="Answer Distribution" style="max-width: 100%;">
+                <img src="data:image/svg+xml;base64,{answer_chart}" alt="Answer Distribution" style="max-width: 100%;">
             </div>
             ''' if answer_chart else ''}
 
             {f'''
             <div class="chart-container">
                 <div class="chart-title">⏱️ Processing Time Trend</div>
-                <img src="data:image/png;base64,{time_chart}" alt="Processing Time Trend" style="max-width: 100%;">
+                <img src="data:image/svg+xml;base64,{time_chart}" alt="Processing Time Trend" style="max-width: 100%;">
             </div>
             ''' if time_chart else ''}
 
@@ -528,149 +691,38 @@ def generate_html_report(
             </div>
 
             <div class="results-container" id="results-container">
-                {generate_result_cards(results, image_dir, intermediate_dir)}
+                """)
+            for card_index, card_html in enumerate(iter_result_cards(
+                results, image_dir, intermediate_dir, io_workers,
+                output_dir=str(Path(output_path).parent), inline_images=inline_images
+            )):
+                if card_index:
+                    f.write('\n')
+                f.write(card_html)
+            f.write(f"""
             </div>
 
             <div class="footer">
                 <p>Washing Machine Knob State Recognition System v1.0 | Three-Stage CoT Reasoning</p>
-                <p>© 2025 Visual Analysis Team | Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            </div>
-
-            <script>
-                function filterResults() {{
-                    const minConfidence = parseFloat(document.getElementById('confidence-filter').value);
-                    const successFilter = document.getElementById('success-filter').value;
-                    const searchText = document.getElementById('search-input').value.toLowerCase();
-                    
-                    const cards = document.querySelectorAll('.result-card');
-                    
-                    cards.forEach(card => {{
-                        const confidence = parseFloat(card.dataset.confidence || '0');
-                        const isSuccess = card.dataset.success === 'true';
-                        const answer = card.dataset.answer?.toLowerCase() || '';
-                        
-                        let show = true;
-                        
-                        if (confidence < minConfidence) show = false;
-                        if (successFilter === 'success' && !isSuccess) show = false;
-                        if (successFilter === 'failure' && isSuccess) show = false;
-                        if (searchText && !answer.includes(searchText)) show = false;
-                        
-                        card.style.display = show ? 'block' : 'none';
-                    }});
-                }}
-                
-                function resetFilters() {{
-                    document.getElementById('confidence-filter').value = '0.5';
-                    document.getElementById('success-filter').value = 'success';
-                    document.getElementById('search-input').value = '';
-                    filterResults();
-                }}
-                
-                // Initial filter
-                document.addEventListener('DOMContentLoaded', filterResults);
-            </script>
-        </body>
-        </html>
-        """
-        
-        # Save HTML file
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+                <p>© 2025 Visual Analysis Team | Generated: {generated_at}</p>
+            </div>""")
+            f.write(_REPORT_TAIL)
         
         logger.info(f"HTML report generated: {output_path}")
         
-        # Clean up temporary charts
-        for file in temp_dir.glob('*.png'):
-            file.unlink()
-        temp_dir.rmdir()
-        
     except Exception as e:
         logger.error(f"Failed to generate HTML report: {e}")
         logger.error(f"Stack trace:\n{e.__traceback__}")
 
-def generate_result_cards(results: List[Dict[str, Any]], image_dir: str, intermediate_dir: str) -> str:
-    """Generate result cards HTML"""
-    cards_html = []
-    
-    for i, result in enumerate(results):
-        image_name = result.get('image_name', f'image_{i}')
-        image_path = result.get('image_path', '')
-        success = result.get('success', False)
-        final_answer = result.get('final_answer', 'Unknown')
-        confidence = result.get('confidence', 0.0)
-        
-        # Determine confidence style
-        if confidence >= 0.8:
-            confidence_class = 'high-confidence'
-        elif confidence >= 0.5:
-            confidence_class = 'medium-confidence'
-        else:
-            confidence_class = 'low-confidence'
-        
-        # Get image paths
-        original_image_path = ''
-        stage1_image_path = ''
-        stage2_image_path = ''
-        stage3_image_path = ''
-        
-        if image_dir and image_path:
-            # Original image
-            original_image_name = Path(image_path).name if image_path else image_name
-            original_image_path = os.path.join(image_dir, original_image_name)
-            
-            if os.path.exists(original_image_path):
-                try:
-                    with open(original_image_path, 'rb') as f:
-                        img_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    original_image_path = f"data:image/jpeg;base64,{img_base64}"
-                except Exception as e:
-                    logger.warning(f"Failed to read original image {original_image_path}: {e}")
-                    original_image_path = ''
-        
-        if intermediate_dir and success:
-            # Intermediate stage images
-            base_name = Path(image_name).stem
-            
-            stage1_path = os.path.join(intermediate_dir, f"{base_name}_stage1_rules.jpg")
-            stage2_path = os.path.join(intermediate_dir, f"{base_name}_stage2_answer.jpg")
-            stage3_path = os.path.join(intermediate_dir, f"{base_name}_stage3_validation.jpg")
-            
-            if os.path.exists(stage1_path):
-                try:
-                    with open(stage1_path, 'rb') as f:
-                        img_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    stage1_image_path = f"data:image/jpeg;base64,{img_base64}"
-                except:
-                    stage1_image_path = ''
-            
-            if os.path.exists(stage2_path):
-                try:
-                    with open(stage2_path, 'rb') as f:
-                        img_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    stage2_image_path = f"data:image/jpeg;base64,{img_base64}"
-                except:
-                    stage2_image_path = ''
-            
-            if os.path.exists(stage3_path):
-                try:
-                    with open(stage3_path, 'rb') as f:
-                        img_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    stage3_image_path = f"data:image/jpeg;base64,{img_base64}"
-                except:
-                    stage3_image_path = ''
-        
-        if success:
-            # Success result card
-            card_html = f'''
+# Result card templates, filled per card with str.format_map
+_SUCCESS_CARD_TEMPLATE = '''
             <div class="result-card" data-confidence="{confidence}" data-success="true" data-answer="{final_answer}">
                 <div class="result-header">
                     {image_name} | Confidence: {confidence:.2f}
                 </div>
                 <div class="result-content">
                     <div class="image-container">
-                        {f'<img src="{original_image_path}" class="result-image" alt="Original Image">' if original_image_path else '<p>Original image unavailable</p>'}
+                        {original_image_html}
                     </div>
                     
                     <div class="answer-highlight">
@@ -681,40 +733,38 @@ def generate_result_cards(results: List[Dict[str, Any]], image_dir: str, interme
                     <div class="stages-container">
                         <div class="stage">
                             <div class="stage-title">Stage 1: Rule Extraction</div>
-                            <div>{result.get('stage1_rules', 'No rule information')[:200]}...</div>
-                            {f'<div class="image-container"><img src="{stage1_image_path}" class="result-image" alt="Rule Extraction Visualization"></div>' if stage1_image_path else ''}
+                            <div>{stage1_rules}...</div>
+                            {stage1_image_html}
                         </div>
                         
                         <div class="stage">
                             <div class="stage-title">Stage 2: Application Reasoning</div>
-                            <div>Initial Answer: {result.get('stage2_answer', 'None')}</div>
-                            {f'<div class="image-container"><img src="{stage2_image_path}" class="result-image" alt="Application Reasoning Visualization"></div>' if stage2_image_path else ''}
+                            <div>Initial Answer: {stage2_answer}</div>
+                            {stage2_image_html}
                         </div>
                         
                         <div class="stage">
                             <div class="stage-title">Stage 3: Validation</div>
-                            <div>{result.get('stage3_validation', 'No validation information')}</div>
-                            {f'<div class="image-container"><img src="{stage3_image_path}" class="result-image" alt="Validation Visualization"></div>' if stage3_image_path else ''}
+                            <div>{stage3_validation}</div>
+                            {stage3_image_html}
                         </div>
                     </div>
                     
                     <div style="margin-top: 10px; font-size: 0.9em; color: #666;">
-                        Processing Time: {result.get('processing_time', 0):.2f}s
+                        Processing Time: {processing_time:.2f}s
                     </div>
                 </div>
             </div>
             '''
-        else:
-            # Failure result card
-            error_msg = result.get('error', 'Unknown error')
-            card_html = f'''
+
+_FAILURE_CARD_TEMPLATE = '''
             <div class="result-card error-card" data-success="false">
                 <div class="result-header">
                     {image_name} | Processing Failed
                 </div>
                 <div class="result-content">
                     <div class="image-container">
-                        {f'<img src="{original_image_path}" class="result-image" alt="Original Image">' if original_image_path else '<p>Original image unavailable</p>'}
+                        {original_image_html}
                     </div>
                     
                     <div style="color: #dc3545; font-weight: bold; margin: 10px 0;">
@@ -722,19 +772,183 @@ def generate_result_cards(results: List[Dict[str, Any]], image_dir: str, interme
                     </div>
                     
                     <div class="error-message">
-                        {error_msg[:200]}...
+                        {error_msg}...
                     </div>
                     
                     <div style="margin-top: 10px; font-size: 0.9em; color: #666;">
-                        Processing Time: {result.get('processing_time', 0):.2f}s
+                        Processing Time: {processing_time:.2f}s
                     </div>
                 </div>
             </div>
             '''
-        
-        cards_html.append(card_html)
+
+# Confidence badge classes, selected by bisecting the confidence against the thresholds
+_CONFIDENCE_CLASSES = ('low-confidence', 'medium-confidence', 'high-confidence')
+_CONFIDENCE_THRESHOLDS = (0.5, 0.8)
+
+def _truncate(text: str, limit: int) -> str:
+    """Return at most `limit` characters of text, without copying short strings"""
+    return text if len(text) <= limit else text[:limit]
+
+def _stage_image_html(image_src: str, alt: str) -> str:
+    """Return the image block for a reasoning stage, or '' when the stage has no image"""
+    if not image_src:
+        return ''
+    return f'<div class="image-container"><img src="{image_src}" class="result-image" alt="{alt}"></div>'
+
+# File name suffixes of the stage1/stage2/stage3 visualization images
+_STAGE_IMAGE_SUFFIXES = ('_stage1_rules.jpg', '_stage2_answer.jpg', '_stage3_validation.jpg')
+
+def _card_image_paths(
+    result: Dict[str, Any],
+    index: int,
+    image_dir: str,
+    intermediate_dir: str,
+    existing_files: set
+) -> Tuple[str, str, str, str]:
+    """Return the (original, stage1, stage2, stage3) image file paths for a result card, '' when not applicable"""
+    original_path = ''
+    stage_paths = ('', '', '')
+    image_name = result.get('image_name', f'image_{index}')
+    image_path = result.get('image_path', '')
+    
+    if image_dir and image_path:
+        # Original image
+        original_image_name = os.path.basename(image_path) if image_path else image_name
+        original_path = os.path.join(image_dir, original_image_name)
+    
+    if intermediate_dir and result.get('success', False):
+        # Intermediate stage images that actually exist
+        base_name = os.path.splitext(os.path.basename(image_name))[0]
+        stage_paths = tuple(
+            path if path in existing_files else ''
+            for path in (os.path.join(intermediate_dir, base_name + suffix) for suffix in _STAGE_IMAGE_SUFFIXES)
+        )
+    
+    return (original_path, *stage_paths)
+
+def _list_files(directory: str) -> set:
+    """Return the full paths of the files in a directory using a single scandir pass"""
+    if not directory or not os.path.isdir(directory):
+        return set()
+    with os.scandir(directory) as entries:
+        return {os.path.join(directory, entry.name) for entry in entries if entry.is_file()}
+
+def _is_within(path: str, directory: str) -> bool:
+    """Check whether path lies inside directory"""
+    directory = os.path.abspath(directory)
+    return os.path.commonpath([os.path.abspath(path), directory]) == directory
+
+def _load_image_uri(path: str) -> str:
+    """Return a base64 data URI for an existing image file, or '' if it is unreadable"""
+    try:
+        return f"data:image/jpeg;base64,{read_image_b64(path)}"
+    except OSError as e:
+        logger.warning(f"Failed to read image {path}: {e}")
+        return ''
+
+def build_card(
+    result: Dict[str, Any],
+    index: int,
+    paths: Tuple[str, str, str, str],
+    image_uris: Dict[str, str]
+) -> str:
+    """
+    Render the HTML card for a single result
+    
+    Args:
+        paths: (original, stage1, stage2, stage3) image paths from _card_image_paths
+        image_uris: Mapping from image path to its link or data URI
+    """
+    original_path, stage1_path, stage2_path, stage3_path = paths
+    image_name = result.get('image_name', f'image_{index}')
+    success = result.get('success', False)
+    final_answer = result.get('final_answer', 'Unknown')
+    confidence = result.get('confidence', 0.0)
+    
+    # Determine confidence style
+    confidence_class = _CONFIDENCE_CLASSES[bisect.bisect_right(_CONFIDENCE_THRESHOLDS, confidence)]
+    
+    # Get image sources; an original image that cannot be inlined keeps its file path
+    original_image_path = image_uris.get(original_path) or original_path
+    stage1_image_path = image_uris.get(stage1_path, '')
+    stage2_image_path = image_uris.get(stage2_path, '')
+    stage3_image_path = image_uris.get(stage3_path, '')
+    
+    original_image_html = (
+        f'<img src="{original_image_path}" class="result-image" alt="Original Image">'
+        if original_image_path else '<p>Original image unavailable</p>'
+    )
+    
+    if success:
+        # Success result card
+        card_html = _SUCCESS_CARD_TEMPLATE.format_map({
+            'image_name': image_name,
+            'final_answer': final_answer,
+            'confidence': confidence,
+            'confidence_class': confidence_class,
+            'original_image_html': original_image_html,
+            'stage1_rules': _truncate(result.get('stage1_rules', 'No rule information'), 200),
+            'stage1_image_html': _stage_image_html(stage1_image_path, 'Rule Extraction Visualization'),
+            'stage2_answer': result.get('stage2_answer', 'None'),
+            'stage2_image_html': _stage_image_html(stage2_image_path, 'Application Reasoning Visualization'),
+            'stage3_validation': result.get('stage3_validation', 'No validation information'),
+            'stage3_image_html': _stage_image_html(stage3_image_path, 'Validation Visualization'),
+            'processing_time': result.get('processing_time', 0)
+        })
+    else:
+        # Failure result card
+        card_html = _FAILURE_CARD_TEMPLATE.format_map({
+            'image_name': image_name,
+            'original_image_html': original_image_html,
+            'error_msg': _truncate(result.get('error', 'Unknown error'), 200),
+            'processing_time': result.get('processing_time', 0)
+        })
+    
+    return card_html
+
+def iter_result_cards(
+    results: List[Dict[str, Any]],
+    image_dir: str,
+    intermediate_dir: str,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    output_dir: str = '',
+    inline_images: str = 'always'
+) -> Iterator[str]:
+    """
+    Yield result card HTML one card at a time
+    
+    Callers write each card as it is produced, so at most one card string is
+    held in memory; cards are separated by a newline.
+    
+    Args:
+        output_dir: Directory of the report, used to build relative image links
+        inline_images: 'always' embeds every image as base64, 'never' links every
+            image by relative path, 'auto' links only images inside output_dir
+    """
+    # One directory listing per image directory instead of an exists() call per card image
+    existing_files = _list_files(image_dir) | _list_files(intermediate_dir)
+    card_paths = [
+        _card_image_paths(result, i, image_dir, intermediate_dir, existing_files)
+        for i, result in enumerate(results)
+    ]
+    
+    # Read and encode all distinct images up front with many reads in flight at once;
+    # file reads and b64encode release the GIL, so storage latency overlaps across images
+    unique_paths = list({path for paths in card_paths for path in paths if path in existing_files})
+    image_uris = {}
+    if output_dir and inline_images != 'always':
+        # Images the browser can reach relative to the report are linked instead of inlined
+        linked_paths = [path for path in unique_paths if inline_images == 'never' or _is_within(path, output_dir)]
+        for path in linked_paths:
+            image_uris[path] = quote(Path(os.path.relpath(path, output_dir)).as_posix())
+        unique_paths = [path for path in unique_paths if path not in image_uris]
+    if unique_paths:
+        with ThreadPoolExecutor(max_workers=max(1, io_workers)) as executor:
+            image_uris.update(zip(unique_paths, executor.map(_load_image_uri, unique_paths)))
     
-    return '\n'.join(cards_html)
+    for i, (result, paths) in enumerate(zip(results, card_paths)):
+        yield build_card(result, i, paths, image_uris)
 
 def main():
     """Main function"""
@@ -750,25 +964,21 @@ def main():
         if not results:
             logger.warning("No valid results found, generating empty report")
             # Create empty report
-            empty_stats = {
-                'total_count': 0,
-                'success_count': 0,
-                'failure_count': 0,
-                'avg_confidence': 0.0,
-                'answer_distribution': Counter(),
-                'processing_time_stats': {}
-            }
             generate_html_report(
                 results=[],
-                stats=empty_stats,
+                stats=generate_statistics([]),
                 output_path=args.output_html,
                 image_dir=args.image_dir,
-                intermediate_dir=args.intermediate_dir
+                intermediate_dir=args.intermediate_dir,
+                io_workers=args.io_workers,
+                inline_images=args.inline_images
             )
             return
         
         # Generate statistics
         stats = generate_statistics(results)
+        if args.stats_json:
+            dump_stats(stats, args.stats_json)
         
         # Generate HTML report
         generate_html_report(
@@ -776,7 +986,9 @@ def main():
             stats=stats,
             output_path=args.output_html,
             image_dir=args.image_dir,
-            intermediate_dir=args.intermediate_dir
+            intermediate_dir=args.intermediate_dir,
+            io_workers=args.io_workers,
+            inline_images=args.inline_images
         )
         
         logger.info("HTML report generation complete!")
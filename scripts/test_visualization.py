@@ -2,6 +2,7 @@
 """
 Test visualization pipeline - verify that geometric info is correctly parsed and drawn
 """
+import os
 import sys
 import json
 from pathlib import Path
@@ -10,28 +11,41 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.utils.visualization import parse_geometric_info_from_rules, save_intermediate_images
+from src.utils.visualization import parse_geometric_info_from_rules, save_intermediate_images, open_rgb_image, JPEG_SAVE_OPTIONS
 from src.utils.visualization_draw import draw_auxiliary_lines_on_image
-from PIL import Image
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib parser
+    orjson = None
 
-def test_parsing():
+RESULT_FILE = project_root / "output/washer_knob_eval/intermediate_images/knob_with_status_1_complete_results.json"
+
+# Candidate locations of the original test image
+_ORIGINAL_IMAGE_PATHS = (
+    str(project_root / "data/test/with_status/knob_with_status_1.png"),
+    "/mnt/data/datasets/washing_machine_eval_data/knob/with_status/knob_with_status_1.png",
+)
+# The drawing test can also fall back to a previously saved auxiliary image
+_POSSIBLE_IMAGE_PATHS = _ORIGINAL_IMAGE_PATHS + (
+    str(project_root / "output/washer_knob_eval/intermediate_images/knob_with_status_1_auxiliary_lines.jpg"),
+)
+
+
+def load_result_file(result_file=RESULT_FILE):
+    """Load the saved complete results once; returns None if the file is missing"""
+    if not result_file.exists():
+        return None
+    raw = result_file.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _check_parsing(data):
     """Test 1: Verify geometric info parsing"""
     print("="*80)
     print("TEST 1: Geometric Info Parsing")
     print("="*80)
     
-    # Load a sample result
-    result_file = project_root / "output/washer_knob_eval/intermediate_images/knob_with_status_1_complete_results.json"
-    
-    if not result_file.exists():
-        print(f"❌ Result file not found: {result_file}")
-        print("Please run evaluation first: bash scripts/run_eval.sh")
-        return False
-    
-    with open(result_file, 'r') as f:
-        data = json.load(f)
-    
     stage1_rules = data.get('stage1_rules', '')
     
     print(f"\nStage1 rules length: {len(stage1_rules)} chars")
@@ -84,41 +98,26 @@ def test_parsing():
     return success, geo_info
 
 
-def test_drawing(geo_info):
+def _check_drawing(geo_info):
     """Test 2: Verify drawing function works"""
     print("="*80)
     print("TEST 2: Auxiliary Lines Drawing")
     print("="*80)
     
-    # Load original image
-    image_path = project_root / "data/test/with_status/knob_with_status_1.png"
-    
-    # Try multiple possible paths
-    possible_paths = [
-        project_root / "data/test/with_status/knob_with_status_1.png",
-        Path("/mnt/data/datasets/washing_machine_eval_data/knob/with_status/knob_with_status_1.png"),
-        project_root / "output/washer_knob_eval/intermediate_images/knob_with_status_1_auxiliary_lines.jpg"
-    ]
-    
-    image_path = None
-    for path in possible_paths:
-        if path.exists():
-            image_path = path
-            break
+    # Load original image, trying multiple possible paths
+    image_path = next((p for p in _POSSIBLE_IMAGE_PATHS if os.path.exists(p)), None)
     
     if not image_path:
         print(f"❌ Could not find test image")
         print("Searched in:")
-        for path in possible_paths:
+        for path in _POSSIBLE_IMAGE_PATHS:
             print(f"  - {path}")
         return False
     
     print(f"\nUsing image: {image_path}")
     
     try:
-        img = Image.open(image_path)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+        img = open_rgb_image(image_path)
         
         print(f"Image size: {img.size}")
         
@@ -136,7 +135,7 @@ def test_drawing(geo_info):
         test_output_dir.mkdir(parents=True, exist_ok=True)
         
         output_path = test_output_dir / "test_auxiliary_lines.jpg"
-        img_with_lines.save(output_path, quality=95)
+        img_with_lines.save(output_path, **JPEG_SAVE_OPTIONS)
         
         print(f"\n✅ TEST 2 PASSED: Successfully drew auxiliary lines")
         print(f"   Output saved to: {output_path}")
@@ -154,33 +153,14 @@ def test_drawing(geo_info):
         return False
 
 
-def test_full_pipeline():
+def _run_full_pipeline(results):
     """Test 3: Verify full save_intermediate_images pipeline"""
     print("="*80)
     print("TEST 3: Full Pipeline")
     print("="*80)
     
-    # Load test data
-    result_file = project_root / "output/washer_knob_eval/intermediate_images/knob_with_status_1_complete_results.json"
-    
-    if not result_file.exists():
-        print(f"❌ Result file not found: {result_file}")
-        return False
-    
-    with open(result_file, 'r') as f:
-        results = json.load(f)
-    
     # Find original image
-    possible_paths = [
-        project_root / "data/test/with_status/knob_with_status_1.png",
-        Path("/mnt/data/datasets/washing_machine_eval_data/knob/with_status/knob_with_status_1.png"),
-    ]
-    
-    image_path = None
-    for path in possible_paths:
-        if path.exists():
-            image_path = path
-            break
+    image_path = next((p for p in _ORIGINAL_IMAGE_PATHS if os.path.exists(p)), None)
     
     if not image_path:
         print(f"❌ Could not find original image")
@@ -191,7 +171,7 @@ def test_full_pipeline():
     
     try:
         save_intermediate_images(
-            image_path=str(image_path),
+            image_path=image_path,
             results=results,
             output_dir=str(test_output_dir),
             image_name="knob_with_status_1.png"
@@ -237,8 +217,15 @@ def main():
     print("="*80)
     print("")
     
+    # Load the sample result once for all tests
+    data = load_result_file()
+    if data is None:
+        print(f"❌ Result file not found: {RESULT_FILE}")
+        print("Please run evaluation first: bash scripts/run_eval.sh")
+        return 1
+    
     # Test 1: Parsing
-    success1, geo_info = test_parsing()
+    success1, geo_info = _check_parsing(data)
     if not success1:
         print("\n⚠️  Parsing test failed, skipping drawing tests")
         return 1
@@ -246,12 +233,12 @@ def main():
     print("")
     
     # Test 2: Drawing
-    success2 = test_drawing(geo_info)
+    success2 = _check_drawing(geo_info)
     
     print("")
     
     # Test 3: Full pipeline
-    success3 = test_full_pipeline()
+    success3 = _run_full_pipeline(data)
     
     # Summary
     print("\n" + "="*80)
@@ -8,18 +8,39 @@ import os
 import argparse
 import json
 import logging
+import re
 import time
-import concurrent.futures
+import asyncio
+import base64
+import zlib
+import threading
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import traceback
 import datetime
 
 src_dir = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_dir))
 
+try:
+    import orjson
+except ImportError:  # orjson不可用时回退到标准库json
+    orjson = None
+
 from src.base.vlm_agent import VLMAgentEAS
 from src.base.cot_engine import CoTEngine
+from src.utils.visualization import save_intermediate_images
+
+# 本次运行中已确认存在的目录，避免每张图像重复发起mkdir系统调用
+_CREATED_DIRS = set()
+
+def _ensure_dir(path: str) -> None:
+    """确保目录存在，同一路径在一次运行中只创建一次"""
+    if path not in _CREATED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _CREATED_DIRS.add(path)
 
 # 设置日志
 def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
@@ -30,18 +51,61 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
     
     handlers = [logging.StreamHandler()]
     if log_file:
+        _ensure_dir(os.path.dirname(log_file) or '.')
         handlers.append(logging.FileHandler(log_file, mode='a'))
     
+    # 模块导入时已调用过一次，force=True使main中带日志文件的再次配置替换原有处理器而不是被忽略
     logging.basicConfig(
         level=numeric_level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=handlers
+        handlers=handlers,
+        force=True
     )
     logger = logging.getLogger(__name__)
     return logger
 
 logger = setup_logging()
 
+# 最终答案中<answer>标签的提取正则，以及兜底扫描时需要跳过的行前缀
+_ANSWER_RE = re.compile(r'<answer>(.*?)</answer>', re.DOTALL)
+_SKIP_PREFIXES = ('#', '**')
+
+def _extract_short_answer(final_answer: str) -> str:
+    """从最终答案中提取简短答案：优先取<answer>标签内容，否则取最后一个非标题行"""
+    if '<answer>' in final_answer and '</answer>' in final_answer:
+        match = _ANSWER_RE.search(final_answer)
+        return match.group(1).strip() if match else final_answer
+    
+    # 先只切分末尾几行，找不到时再扫描其余部分，避免切分整段长文本
+    head, *tail = final_answer.rsplit('\n', 8)
+    for lines in (tail, head.split('\n')):
+        for line in reversed(lines):
+            line = line.strip()
+            if line and not line.startswith(_SKIP_PREFIXES):
+                return line
+    return final_answer
+
+def _iso_timestamp(timestamp_ns: int) -> str:
+    """将time.time_ns()记录的时间转换为本地时间ISO字符串(与datetime.now().isoformat()格式一致)"""
+    return datetime.datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+def compress_raw_responses(raw_responses: Dict[str, Any]) -> str:
+    """将原始响应压缩为zlib+base64字符串，保证JSONL记录仍是合法JSON"""
+    return base64.b64encode(zlib.compress(_dump_jsonl_line(raw_responses), 6)).decode('ascii')
+
+def decompress_raw_responses(record: Dict[str, Any]) -> Dict[str, Any]:
+    """按需还原记录中压缩保存的原始响应，未保存时返回空字典"""
+    packed = record.get('raw_responses_zlib_b64')
+    if not packed:
+        return {}
+    return json.loads(zlib.decompress(base64.b64decode(packed)))
+
+def _dump_jsonl_line(record: Dict[str, Any]) -> bytes:
+    """将单条结果序列化为一行UTF-8编码的JSON"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
 def parse_args() -> argparse.Namespace:
     """解析命令行参数"""
     parser = argparse.ArgumentParser(description='洗衣机旋钮状态分析器 - 批量处理版')
@@ -59,6 +123,12 @@ def parse_args() -> argparse.Namespace:
                        help='结果JSONL文件路径')
     parser.add_argument('--save_intermediate_images', type=lambda x: x.lower() == 'true', default=True,
                        help='是否保存中间推理图像')
+    parser.add_argument('--save_raw_responses', action='store_true',
+                       help='在结果JSONL中保存各阶段原始响应(zlib压缩+base64)，默认不保存')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                       help='VLM响应磁盘缓存目录，重跑相同图像时直接复用各阶段响应，默认不缓存')
+    parser.add_argument('--resume', action='store_true',
+                       help='断点续跑：保留已有结果文件，跳过其中已成功处理的图像')
     
     # API配置
     parser.add_argument('--eas_url', type=str, 
@@ -86,22 +156,103 @@ def parse_args() -> argparse.Namespace:
                        help='日志级别')
     parser.add_argument('--debug', action='store_true',
                        help='启用调试模式')
+    parser.add_argument('--always_validate', action='store_true',
+                       help='始终执行阶段3验证，即使阶段2已给出阶段1规则中的已知模式')
     
     return parser.parse_args()
 
+_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+def _iter_image_files(directory: str) -> Iterator[str]:
+    """递归扫描目录并逐个产出图像路径，直接使用DirEntry的文件名与类型，无需额外stat"""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_image_files(entry.path)
+                elif entry.name.lower().endswith(_IMAGE_EXTENSIONS):
+                    yield entry.path
+    except OSError as e:
+        # 与os.walk一致，跳过无法读取的子目录
+        logger.warning(f"无法读取目录 {directory}: {e}")
+
+def load_completed_images(jsonl_path: str) -> set:
+    """读取已有结果JSONL，返回已成功处理的图像路径集合(忽略中断时写坏的行)"""
+    done = set()
+    with open(jsonl_path, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line) if orjson is not None else json.loads(line)
+            except ValueError:
+                continue
+            if record.get('success') and record.get('image_path'):
+                done.add(record['image_path'])
+    return done
+
+def compact_results(jsonl_path: str) -> List[Dict[str, Any]]:
+    """
+    按image_path去重结果JSONL(同一图像保留最后一条记录)，并原子地重写文件
+    
+    续跑时失败图像的重试结果追加在旧的失败记录之后，去重后每张图像只保留最新结果；
+    中断时写坏的行同时被丢弃
+    
+    Returns:
+        去重后的记录列表(按图像首次出现的顺序)
+    """
+    latest: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+    with open(jsonl_path, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line) if orjson is not None else json.loads(line)
+            except ValueError:
+                continue
+            key = record.get('image_path') or record.get('image_name')
+            latest[key] = (line.rstrip(b'\r\n') + b'\n', record)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(jsonl_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(line for line, _ in latest.values())
+        os.replace(tmp_path, jsonl_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return [record for _, record in latest.values()]
+
 def get_image_files(image_dir: str) -> List[str]:
     """获取目录中的所有图像文件"""
-    supported_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
-    image_files = []
-    
-    for root, _, files in os.walk(image_dir):
-        for file in files:
-            if Path(file).suffix.lower() in supported_extensions:
-                image_files.append(os.path.join(root, file))
+    image_files = list(_iter_image_files(image_dir))
     
     logger.info(f"找到 {len(image_files)} 个图像文件")
     return image_files
 
+# 按配置缓存的CoT引擎(连同其VLM Agent)，同一次运行中的所有图像复用同一实例
+_COT_ENGINE_CACHE: Dict[Tuple[Any, ...], CoTEngine] = {}
+_COT_ENGINE_CACHE_LOCK = threading.Lock()
+
+def get_cot_engine(config: Dict[str, Any]) -> CoTEngine:
+    """获取与配置对应的CoT引擎，首次调用时创建VLM Agent与CoT引擎"""
+    question = config.get('question', 'Determine the current knob position')
+    cache_dir = config.get('cache_dir')
+    key = (config['eas_url'], config['eas_token'], config['model_name'],
+           config['max_tokens'], config['timeout'], question, cache_dir)
+    cot_engine = _COT_ENGINE_CACHE.get(key)
+    if cot_engine is None:
+        with _COT_ENGINE_CACHE_LOCK:
+            cot_engine = _COT_ENGINE_CACHE.get(key)
+            if cot_engine is None:
+                vlm_agent = VLMAgentEAS(
+                    base_url=config['eas_url'],
+                    token=config['eas_token'],
+                    model_name=config['model_name'],
+                    max_tokens=config['max_tokens'],
+                    timeout=config['timeout'],
+                    cache_dir=cache_dir
+                )
+                cot_engine = CoTEngine(vlm_agent, task_type="washer_knob", question=question)
+                _COT_ENGINE_CACHE[key] = cot_engine
+    return cot_engine
+
 def process_single_image(args: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
     """处理单个图像"""
     image_path, config = args
@@ -110,41 +261,29 @@ def process_single_image(args: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
     result = {
         'image_path': image_path,
         'image_name': image_name,
-        'timestamp': datetime.datetime.now().isoformat(),
+        # 处理中只记录整数纳秒时间，收集结果时再格式化为ISO字符串
+        'timestamp': time.time_ns(),
         'success': False,
         'error': None
     }
     
     try:
-        # 初始化VLM Agent (每次处理都重新初始化，避免进程间共享问题)
-        vlm_agent = VLMAgentEAS(
-            base_url=config['eas_url'],
-            token=config['eas_token'],
-            model_name=config['model_name'],
-            max_tokens=config['max_tokens'],
-            timeout=config['timeout']
-        )
-        
-        # 初始化CoT引擎
-        cot_engine = CoTEngine(
-            vlm_agent, 
-            task_type="washer_knob",
-            question=config.get('question', 'Determine the current knob position')
-        )
+        # 获取CoT引擎 (VLM Agent与CoT引擎均无每次推理的状态，可在线程间复用)
+        cot_engine = get_cot_engine(config)
         
         # 执行CoT推理
         start_time = time.time()
         cot_results = cot_engine.reason(
             image_path=image_path,
-            depth_path=None  # 目前不处理深度图
+            depth_path=None,  # 目前不处理深度图
+            skip_validation_when_certain=not config['always_validate']
         )
         processing_time = time.time() - start_time
         
         # 保存中间图像 (如果启用)
         if config['save_intermediate_images']:
-            from src.utils.visualization import save_intermediate_images
             intermediate_dir = Path(config['output_dir']) / 'intermediate_images'
-            intermediate_dir.mkdir(parents=True, exist_ok=True)
+            _ensure_dir(str(intermediate_dir))
             
             save_intermediate_images(
                 image_path=image_path,
@@ -162,84 +301,104 @@ def process_single_image(args: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
             'stage3_validation': cot_results.get('stage3_validation', ''),
             'final_answer': cot_results.get('final_answer', ''),
             'confidence': round(cot_results.get('confidence', 0.0), 2),
+            # 阶段3被跳过(阶段2答案为已知模式)时为True，便于与完整三阶段验证的结果区分
+            'validation_skipped': cot_results.get('validation_skipped', False),
             'raw_responses': cot_results.get('raw_responses', {})
         })
         
-        logger.info(f"成功处理 {image_name}: {result['final_answer']} (置信度: {result['confidence']})")
+        logger.info("成功处理 %s: %s (置信度: %s)", image_name, result['final_answer'], result['confidence'])
         
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"处理 {image_name} 失败: {error_msg}")
-        logger.error(f"堆栈跟踪:\n{traceback.format_exc()}")
+        stack_trace = traceback.format_exc()
+        logger.error("处理 %s 失败: %s\n堆栈跟踪:\n%s", image_name, error_msg, stack_trace)
         result.update({
             'error': error_msg,
-            'stack_trace': traceback.format_exc(),
+            'stack_trace': stack_trace,
             'processing_time': round(time.time() - start_time, 2) if 'start_time' in locals() else 0
         })
     
     return result
 
-def process_images_batch(image_paths: List[str], config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """批量处理图像"""
-    results = []
-    num_processors = min(config['num_processors'], len(image_paths))
+async def _process_images_async(image_paths: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    在单个事件循环中并发处理图像，阻塞的VLM请求交给线程池执行，由信号量限制在途请求数
     
-    logger.info(f"开始批量处理 {len(image_paths)} 个图像，使用 {num_processors} 个处理器")
+    结果只流式写入JSONL，内存中不保留，图像再多内存占用也保持平稳
+    """
+    # 随结果到达增量更新统计，避免处理结束后再对全部结果多次遍历
+    stats = {'processed_count': 0, 'success_count': 0, 'confidence_sum': 0.0}
+    total = len(image_paths)
+    num_workers = max(1, config['num_processors'])
+    semaphore = asyncio.Semaphore(num_workers)
+    loop = asyncio.get_running_loop()
     
-    # 使用进程池进行并发处理
-    with concurrent.futures.ProcessPoolExecutor(max_workers=num_processors) as executor:
-        # 提交所有任务
-        future_to_image = {
-            executor.submit(process_single_image, (image_path, config)): image_path
-            for image_path in image_paths
-        }
-        
-        # 处理完成的任务
-        for future in concurrent.futures.as_completed(future_to_image):
-            image_path = future_to_image[future]
+    # 结果文件在整个运行期间只打开一次，每条结果写入后立即刷新，中断时不丢失已完成的结果
+    jsonl_fh = open(config['output_jsonl'], 'ab', buffering=1 << 16) if config['output_jsonl'] else None
+    executor = ThreadPoolExecutor(max_workers=num_workers)
+    
+    # 提前创建共享的CoT引擎，避免首批任务在关键路径上初始化
+    if image_paths:
+        get_cot_engine(config)
+    
+    async def run_one(image_path: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[BaseException]]:
+        async with semaphore:
             try:
-                result = future.result()
-                results.append(result)
+                result = await loop.run_in_executor(executor, process_single_image, (image_path, config))
+                return image_path, result, None
+            except Exception as e:
+                return image_path, None, e
+    
+    try:
+        # 处理完成的任务(结果在事件循环中依次写入，无需额外加锁)
+        for next_done in asyncio.as_completed([run_one(image_path) for image_path in image_paths]):
+            image_path, result, error = await next_done
+            try:
+                if error is not None:
+                    raise error
+                stats['processed_count'] += 1
+                result['timestamp'] = _iso_timestamp(result['timestamp'])
+                if result.get('success'):
+                    stats['success_count'] += 1
+                    stats['confidence_sum'] += result.get('confidence', 0)
                 
                 # 实时保存结果
-                if config['output_jsonl']:
-                    with open(config['output_jsonl'], 'a', encoding='utf-8') as f:
-                        # Extract short answer from final_answer
-                        short_answer = result.get('final_answer', '')
-                        if '<answer>' in short_answer and '</answer>' in short_answer:
-                            import re
-                            match = re.search(r'<answer>(.*?)</answer>', short_answer, re.DOTALL)
-                            if match:
-                                short_answer = match.group(1).strip()
-                        else:
-                            # Extract from last line or after common patterns
-                            lines = short_answer.split('\n')
-                            for line in reversed(lines):
-                                line = line.strip()
-                                if line and not line.startswith('#') and not line.startswith('**'):
-                                    short_answer = line
-                                    break
-                        
-                        result['answer'] = short_answer
-                        f.write(json.dumps(result, ensure_ascii=False) + '\n')
+                if jsonl_fh is not None:
+                    # Extract short answer from final_answer
+                    result['answer'] = _extract_short_answer(result.get('final_answer', ''))
+                    # 原始响应体积较大：默认不写入，开启时压缩保存；内存中均不再保留
+                    raw_responses = result.pop('raw_responses', None)
+                    if raw_responses and config.get('save_raw_responses'):
+                        result['raw_responses_zlib_b64'] = compress_raw_responses(raw_responses)
+                    jsonl_fh.write(_dump_jsonl_line(result))
+                    jsonl_fh.flush()
                 
-                processed = len(results)
-                total = len(image_paths)
+                processed = stats['processed_count']
                 if processed % max(1, total // 10) == 0 or processed == total:
-                    logger.info(f"进度: {processed}/{total} ({processed/total*100:.1f}%)")
+                    logger.info("进度: %d/%d (%.1f%%)", processed, total, processed / total * 100)
                 
             except Exception as e:
-                logger.error(f"处理 {image_path} 时发生异常: {e}")
-                logger.error(f"堆栈跟踪:\n{traceback.format_exc()}")
-                results.append({
-                    'image_path': image_path,
-                    'success': False,
-                    'error': str(e),
-                    'stack_trace': traceback.format_exc()
-                })
-    
-    logger.info(f"批量处理完成，成功: {sum(1 for r in results if r.get('success'))}/{len(results)}")
-    return results
+                stack_trace = traceback.format_exc()
+                logger.error("处理 %s 时发生异常: %s\n堆栈跟踪:\n%s", image_path, e, stack_trace)
+                stats['processed_count'] += 1
+    finally:
+        executor.shutdown(wait=True)
+        if jsonl_fh is not None:
+            jsonl_fh.close()
+    
+    return stats
+
+def process_images_batch(image_paths: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
+    """批量处理图像，结果写入JSONL，返回增量统计(processed_count, success_count, confidence_sum)"""
+    num_processors = min(config['num_processors'], len(image_paths))
+    
+    logger.info("开始批量处理 %d 个图像，并发数 %d", len(image_paths), num_processors)
+    
+    # 远程VLM调用以网络等待为主，用事件循环+线程代替进程池，省去进程启动与结果pickle开销
+    stats = asyncio.run(_process_images_async(image_paths, {**config, 'num_processors': num_processors}))
+    
+    logger.info("批量处理完成，成功: %d/%d", stats['success_count'], stats['processed_count'])
+    return stats
 
 def main() -> None:
     """主函数"""
@@ -252,10 +411,10 @@ def main() -> None:
         return
     
     # 创建输出目录
-    os.makedirs(args.output_dir, exist_ok=True)
-    os.makedirs(os.path.join(args.output_dir, 'logs'), exist_ok=True)
+    _ensure_dir(args.output_dir)
+    _ensure_dir(os.path.join(args.output_dir, 'logs'))
     if args.save_intermediate_images:
-        os.makedirs(os.path.join(args.output_dir, 'intermediate_images'), exist_ok=True)
+        _ensure_dir(os.path.join(args.output_dir, 'intermediate_images'))
     
     # 获取图像文件
     image_files = get_image_files(args.image_dir)
@@ -273,25 +432,53 @@ def main() -> None:
         'output_dir': args.output_dir,
         'output_jsonl': args.output_jsonl,
         'save_intermediate_images': args.save_intermediate_images,
+        'save_raw_responses': args.save_raw_responses,
+        'cache_dir': args.cache_dir,
+        'always_validate': args.always_validate,
         'num_processors': args.num_processors,
         'batch_size': args.batch_size,
         'question': args.question
     }
     
-    # 清空或创建输出文件
-    if os.path.exists(args.output_jsonl):
+    # 断点续跑时跳过已成功的图像并在原文件后追加，否则清空或创建输出文件
+    resumed = args.resume and os.path.exists(args.output_jsonl)
+    if resumed:
+        done = load_completed_images(args.output_jsonl)
+        image_files = [p for p in image_files if p not in done]
+        logger.info(f"续跑模式: 跳过 {len(done)} 个已处理图像，剩余 {len(image_files)} 个")
+        # 中断可能留下不完整的末行，补上换行以免与新记录粘连
+        with open(args.output_jsonl, 'rb+') as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        if not image_files:
+            logger.info("所有图像均已处理完成")
+            return
+    elif os.path.exists(args.output_jsonl):
         logger.info(f"清空现有结果文件: {args.output_jsonl}")
         open(args.output_jsonl, 'w').close()
     
     # 处理图像
     start_time = time.time()
-    results = process_images_batch(image_files, config)
+    stats = process_images_batch(image_files, config)
     total_time = time.time() - start_time
     
-    # 保存最终统计
-    success_count = sum(1 for r in results if r.get('success'))
-    avg_confidence = sum(r.get('confidence', 0) for r in results if r.get('success')) / max(success_count, 1)
-    avg_time = total_time / len(image_files) if image_files else 0
+    processed_count = len(image_files)
+    if resumed:
+        # 续跑时摘要需覆盖全部图像: 合并新旧结果，每张图像以最新记录为准
+        records = compact_results(args.output_jsonl)
+        total_images = len(records)
+        successes = [r for r in records if r.get('success')]
+        success_count = len(successes)
+        avg_confidence = sum(r.get('confidence', 0) for r in successes) / max(success_count, 1)
+    else:
+        # 保存最终统计 (处理过程中已增量累计)
+        total_images = processed_count
+        success_count = stats['success_count']
+        avg_confidence = stats['confidence_sum'] / max(success_count, 1)
+    # 平均耗时只针对本次运行实际处理的图像
+    avg_time = total_time / processed_count if processed_count else 0
     
     # 创建安全的配置副本，移除敏感信息
     safe_config = {
@@ -301,6 +488,9 @@ def main() -> None:
         'timeout': config['timeout'],
         'output_dir': config['output_dir'],
         'save_intermediate_images': config['save_intermediate_images'],
+        'save_raw_responses': config['save_raw_responses'],
+        'cache_dir': config['cache_dir'],
+        'always_validate': config['always_validate'],
         'num_processors': config['num_processors'],
         'batch_size': config['batch_size'],
         'question': config['question']
@@ -308,9 +498,10 @@ def main() -> None:
     }
     
     summary = {
-        'total_images': len(image_files),
+        'total_images': total_images,
+        'processed_this_run': processed_count,
         'success_count': success_count,
-        'success_rate': round(success_count / len(image_files) * 100, 2) if image_files else 0,
+        'success_rate': round(success_count / total_images * 100, 2) if total_images else 0,
         'average_confidence': round(avg_confidence, 2),
         'average_processing_time': round(avg_time, 2),
         'total_time': round(total_time, 2),
@@ -323,7 +514,7 @@ def main() -> None:
         json.dump(summary, f, ensure_ascii=False, indent=2)
     
     logger.info("处理完成!")
-    logger.info(f"成功处理: {success_count}/{len(image_files)}")
+    logger.info(f"成功处理: {success_count}/{total_images}")
     logger.info(f"平均置信度: {avg_confidence:.2f}")
     logger.info(f"总耗时: {total_time:.2f}秒，平均: {avg_time:.2f}秒/图像")
     logger.info(f"结果保存到: {args.output_jsonl}")
@@ -2,20 +2,29 @@
 """
 Rotary Control Recognition Evaluator - Bbox Enhanced Version
 Generic geometric reasoning without task-specific priors
-Single-process sequential processing with graceful interruption support
+Single-process concurrent processing with graceful interruption support
 """
 import sys
 import os
 import argparse
 import json
 import logging
+import re
 import time
 import signal
+import shutil
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import traceback
 import datetime
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json
+    orjson = None
+
 # Add src path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -24,6 +33,13 @@ from src.base.vlm_agent import VLMAgentEAS
 from src.base.cot_engine import CoTEngine
 from src.utils.prompt_templates import TaskTemplates
 from src.utils.prompt_templates_bbox import BboxEnhancedTemplates
+from src.utils.visualization import save_intermediate_images
+
+# Background writers for intermediate images, so disk I/O stays off the VLM call path
+INTERMEDIATE_IO_WORKERS = 4
+
+# The generic rotary template is static; build it once instead of once per sample
+_ROTARY_TEMPLATE = BboxEnhancedTemplates.get_generic_rotary_template_with_bbox()
 
 # Global flag for graceful shutdown
 interrupted = False
@@ -33,7 +49,7 @@ def signal_handler(signum, frame):
     global interrupted
     interrupted = True
     print("\n\n" + "="*80)
-    print("⚠️  Interrupt signal received. Finishing current sample and saving results...")
+    print("⚠️  Interrupt signal received. Finishing in-flight samples and saving results...")
     print("="*80 + "\n")
 
 # Register signal handlers
@@ -56,7 +72,9 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
     logging.basicConfig(
         level=numeric_level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=handlers
+        handlers=handlers,
+        # Replace the import-time default configuration, otherwise this call is a no-op
+        force=True
     )
     logger = logging.getLogger(__name__)
     return logger
@@ -97,6 +115,18 @@ def parse_args() -> argparse.Namespace:
                        help='Maximum generation tokens (4096 recommended for 3-stage reasoning)')
     parser.add_argument('--timeout', type=int, default=int(os.getenv('TIMEOUT', '300')),
                        help='Request timeout in seconds')
+    parser.add_argument('--always_validate', action='store_true',
+                       help='Always run stage3 validation, even when stage2 returns a tagged known mode '
+                            '(a mode from the knob JSON with bboxes, or from the stage1 rules without)')
+    parser.add_argument('--preresize', type=int, default=0,
+                       help='Downscale images so the longer side is at most N pixels before upload '
+                            '(0 = full resolution). Bbox coordinates in prompts stay in original pixels, '
+                            'so verify accuracy before enabling')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                       help='On-disk VLM response cache directory; re-runs replay cached responses '
+                            'instead of querying the model (default: no cache, every run measures the model)')
+    parser.add_argument('--max_concurrency', type=int, default=int(os.getenv('MAX_CONCURRENCY', '8')),
+                       help='Maximum number of samples processed concurrently')
     
     # Evaluation configuration
     parser.add_argument('--subset', type=str, choices=['with_status', 'without_status', 'both'], 
@@ -125,14 +155,17 @@ def load_dataset_samples(dataset_dir: str, subset: str, max_samples: Optional[in
         logger.warning(f"Subset directory does not exist: {subset_dir}")
         return samples
     
-    # Find all PNG files
-    png_files = sorted(subset_dir.glob("*.png"))
+    # One directory listing answers both "which PNGs" and "does the JSON exist",
+    # instead of a stat per PNG (costly on network filesystems)
+    with os.scandir(subset_dir) as entries:
+        names = {entry.name for entry in entries if not entry.name.startswith('.')}
     
-    for png_file in png_files:
+    for png_name in sorted(name for name in names if name.endswith('.png')):
+        png_file = subset_dir / png_name
         # Corresponding JSON file
         json_file = png_file.with_suffix('.json')
         
-        if json_file.exists():
+        if json_file.name in names:
             samples.append((str(png_file), str(json_file)))
         else:
             logger.warning(f"Corresponding JSON file not found: {json_file}")
@@ -145,11 +178,97 @@ def load_dataset_samples(dataset_dir: str, subset: str, max_samples: Optional[in
     
     return samples
 
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when available"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _dump_jsonl_line(record: Dict[str, Any]) -> bytes:
+    """Serialize one result as a compact UTF-8 JSON line"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+def _save_intermediate_images_safe(
+    image_path: str,
+    cot_results: Dict[str, Any],
+    intermediate_dir: str,
+    image_name: str
+) -> None:
+    """Save intermediate images, logging instead of raising on failure"""
+    try:
+        save_intermediate_images(
+            image_path=image_path,
+            results=cot_results,
+            output_dir=intermediate_dir,
+            image_name=image_name
+        )
+    except Exception as e:
+        logger.warning("Failed to save intermediate images: %s", e)
+
+def _run_reasoning(
+    image_path: str,
+    knob_data: Dict[str, Any],
+    config: Dict[str, Any],
+    vlm_agent: VLMAgentEAS
+) -> Dict[str, Any]:
+    """Run the configured reasoning strategy on one sample"""
+    if config['use_bbox']:
+        # Bbox-enhanced CoT reasoning
+        return reason_with_bbox_enhancement(
+            vlm_agent=vlm_agent,
+            image_path=image_path,
+            knob_data=knob_data,
+            question=config['question'],
+            always_validate=config['always_validate']
+        )
+    # Standard CoT reasoning
+    cot_engine = CoTEngine(
+        vlm_agent, 
+        task_type="washer_knob",
+        question=config['question']
+    )
+    return cot_engine.reason(
+        image_path=image_path,
+        skip_validation_when_certain=not config['always_validate']
+    )
+
+def _score_result(result: Dict[str, Any], cot_results: Dict[str, Any], ground_truth: Optional[str]) -> None:
+    """Fill in the predicted answer and, when ground truth is available, its correctness"""
+    final_answer = cot_results.get('final_answer', '')
+    predicted_answer = extract_clean_answer(final_answer)
+    result['predicted_answer'] = predicted_answer
+    if ground_truth:
+        result['correct'] = compare_answers(predicted_answer, ground_truth)
+
+def _save_intermediate(
+    config: Dict[str, Any],
+    image_path: str,
+    cot_results: Dict[str, Any],
+    image_name: str,
+    io_pool: Optional[ThreadPoolExecutor] = None
+) -> None:
+    """Save intermediate images, in the background when an I/O pool is given"""
+    intermediate_dir = str(Path(config['output_dir']) / 'intermediate_images')
+    if io_pool is not None:
+        io_pool.submit(_save_intermediate_images_safe, image_path, cot_results, intermediate_dir, image_name)
+    else:
+        _save_intermediate_images_safe(image_path, cot_results, intermediate_dir, image_name)
+
+def _log_sample_status(result: Dict[str, Any], processing_time: float) -> None:
+    """Log the one-line outcome of a processed sample"""
+    correct = result.get('correct')
+    status = "✓" if correct else "✗" if correct is False else "?"
+    logger.info(
+        "%s %s: pred=%s, gt=%s, time=%.1fs",
+        status, result['image_name'], result['predicted_answer'], result['ground_truth'], processing_time
+    )
+
 def process_single_sample(
     image_path: str, 
     json_path: str, 
     config: Dict[str, Any],
-    vlm_agent: VLMAgentEAS
+    vlm_agent: VLMAgentEAS,
+    io_pool: Optional[ThreadPoolExecutor] = None
 ) -> Dict[str, Any]:
     """Process a single sample"""
     image_name = Path(image_path).name
@@ -169,57 +288,19 @@ def process_single_sample(
     
     try:
         # Load JSON data
-        with open(json_path, 'r', encoding='utf-8') as f:
-            knob_data = json.load(f)
+        knob_data = _json_loads(Path(json_path).read_bytes())
         
         # Extract ground truth (if available)
         ground_truth = BboxEnhancedTemplates.extract_ground_truth(knob_data)
         result['ground_truth'] = ground_truth
         
-        # Choose reasoning strategy based on bbox usage
-        if config['use_bbox']:
-            # Bbox-enhanced CoT reasoning
-            cot_results = reason_with_bbox_enhancement(
-                vlm_agent=vlm_agent,
-                image_path=image_path,
-                knob_data=knob_data,
-                question=config['question']
-            )
-        else:
-            # Standard CoT reasoning
-            cot_engine = CoTEngine(
-                vlm_agent, 
-                task_type="washer_knob",
-                question=config['question']
-            )
-            cot_results = cot_engine.reason(image_path=image_path)
-        
+        cot_results = _run_reasoning(image_path, knob_data, config, vlm_agent)
         processing_time = time.time() - start_time
         
-        # Extract final answer
-        final_answer = cot_results.get('final_answer', '')
-        predicted_answer = extract_clean_answer(final_answer)
-        result['predicted_answer'] = predicted_answer
-        
-        # Check correctness (if ground truth available)
-        if ground_truth:
-            result['correct'] = compare_answers(predicted_answer, ground_truth)
+        _score_result(result, cot_results, ground_truth)
         
-        # Save intermediate images (if enabled)
         if config['save_intermediate_images']:
-            try:
-                from src.utils.visualization import save_intermediate_images
-                intermediate_dir = Path(config['output_dir']) / 'intermediate_images'
-                intermediate_dir.mkdir(parents=True, exist_ok=True)
-                
-                save_intermediate_images(
-                    image_path=image_path,
-                    results=cot_results,
-                    output_dir=str(intermediate_dir),
-                    image_name=image_name
-                )
-            except Exception as e:
-                logger.warning(f"Failed to save intermediate images: {e}")
+            _save_intermediate(config, image_path, cot_results, image_name, io_pool)
         
         # Consolidate results
         result.update({
@@ -229,17 +310,19 @@ def process_single_sample(
             'stage2_answer': cot_results.get('stage2_answer', ''),
             'stage3_validation': cot_results.get('stage3_validation', ''),  # Keep full validation
             'confidence': round(cot_results.get('confidence', 0.0), 2),
-            'retry_count': len(cot_results.get('retry_history', []))
+            'retry_count': len(cot_results.get('retry_history', [])),
+            # Distinguishes answers that skipped stage3 from fully validated ones
+            'validation_skipped': cot_results.get('validation_skipped', False)
         })
         
-        status = "✓" if result.get('correct') else "✗" if result.get('correct') is False else "?"
-        logger.info(f"{status} {image_name}: pred={predicted_answer}, gt={ground_truth}, time={processing_time:.1f}s")
+        _log_sample_status(result, processing_time)
         
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"Failed to process {image_name}: {error_msg}")
-        if config.get('log_level') == 'DEBUG':
-            logger.error(f"Stack trace:\n{traceback.format_exc()}")
+        logger.error("Failed to process %s: %s", image_name, error_msg)
+        # The traceback is only formatted when debug output is actually enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stack trace:\n%s", traceback.format_exc())
         result.update({
             'error': error_msg,
             'processing_time': round(time.time() - start_time, 2)
@@ -251,9 +334,10 @@ def reason_with_bbox_enhancement(
     vlm_agent: VLMAgentEAS,
     image_path: str,
     knob_data: Dict[str, Any],
-    question: str
+    question: str,
+    always_validate: bool = False
 ) -> Dict[str, Any]:
-    """Perform CoT reasoning with bbox enhancement"""
+    """Perform CoT reasoning with bbox enhancement; stage3 runs only when stage2 is not clean unless always_validate"""
     
     results = {
         'stage1_rules': '',
@@ -262,7 +346,8 @@ def reason_with_bbox_enhancement(
         'final_answer': '',
         'confidence': 0.0,
         'raw_responses': {},
-        'retry_history': []
+        'retry_history': [],
+        'validation_skipped': False
     }
     
     # Stage 1: Bbox-enhanced rule extraction
@@ -278,13 +363,12 @@ def reason_with_bbox_enhancement(
     
     # Log stage1 response length to detect truncation
     if len(stage1_response) > 0:
-        logger.info(f"Stage1 response length: {len(stage1_response)} chars")
+        logger.info("Stage1 response length: %d chars", len(stage1_response))
         if len(stage1_response) < 500:
-            logger.warning(f"Stage1 response seems too short, may be truncated or incomplete")
+            logger.warning("Stage1 response seems too short, may be truncated or incomplete")
     
     # Stage 2: Apply rules
-    template = BboxEnhancedTemplates.get_generic_rotary_template_with_bbox()
-    stage2_prompt = template['stage2'].format(rules=stage1_response)
+    stage2_prompt = _ROTARY_TEMPLATE['stage2'].format(rules=stage1_response)
     
     stage2_response = vlm_agent.inference_single(
         prompt_text=stage2_prompt,
@@ -295,18 +379,30 @@ def reason_with_bbox_enhancement(
     results['raw_responses']['stage2'] = stage2_response
     
     # Log stage2 response length
-    logger.info(f"Stage2 response length: {len(stage2_response)} chars")
+    logger.info("Stage2 response length: %d chars", len(stage2_response))
     
     # Extract answer
     extracted_answer = TaskTemplates.extract_answer_tag(stage2_response)
     if extracted_answer:
         results['stage2_answer'] = extracted_answer
     
-    # Stage 3: Validation
+    # Synthesize final answer
+    results['final_answer'] = results['stage2_answer']
+    
+    # A tagged stage2 answer that names one of the known modes is already clean;
+    # skip the validation round-trip and use the confidence it would have produced
     modes = knob_data.get('modes', [])
+    if not always_validate and extracted_answer and extracted_answer.strip().lower() in {m.lower() for m in modes}:
+        logger.info("Stage3 skipped for %s: stage2 answer '%s' matches a known mode",
+                    Path(image_path).name, extracted_answer.strip())
+        results['confidence'] = 0.9
+        results['validation_skipped'] = True
+        return results
+    
+    # Stage 3: Validation
     adjacent_modes = ', '.join(modes[:5]) if modes else ""
     
-    stage3_prompt = template['stage3'].format(
+    stage3_prompt = _ROTARY_TEMPLATE['stage3'].format(
         answer=results['stage2_answer'],
         adjacent_modes=adjacent_modes
     )
@@ -320,10 +416,8 @@ def reason_with_bbox_enhancement(
     results['raw_responses']['stage3'] = stage3_response
     
     # Log stage3 response length
-    logger.info(f"Stage3 response length: {len(stage3_response)} chars")
+    logger.info("Stage3 response length: %d chars", len(stage3_response))
     
-    # Synthesize final answer
-    results['final_answer'] = results['stage2_answer']
     results['confidence'] = 0.8  # Base confidence with bbox enhancement
     
     # Adjust confidence based on validation
@@ -334,12 +428,14 @@ def reason_with_bbox_enhancement(
     
     return results
 
+_ANSWER_TAG_RE = re.compile(r'<answer>(.*?)</answer>', re.DOTALL | re.IGNORECASE)
+# A non-blank line, stripped, that is not a heading ('#'), bold ('**') or list item ('-')
+_MEANINGFUL_LINE_RE = re.compile(r'^[^\S\n]*((?!#|\*\*|-)\S.*?)[^\S\n]*$', re.MULTILINE)
+
 def extract_clean_answer(answer_text: str) -> str:
     """Extract clean answer from response text"""
-    import re
-    
     # Try extracting from <answer> tags
-    match = re.search(r'<answer>(.*?)</answer>', answer_text, re.DOTALL | re.IGNORECASE)
+    match = _ANSWER_TAG_RE.search(answer_text)
     if match:
         return match.group(1).strip()
     
@@ -352,19 +448,24 @@ def extract_clean_answer(answer_text: str) -> str:
     
     # If answer is too long, try extracting last meaningful line
     if len(answer_text) > 100:
-        lines = answer_text.split('\n')
-        for line in reversed(lines):
-            line = line.strip()
-            if line and not line.startswith('#') and not line.startswith('**') and not line.startswith('-'):
-                return line
+        lines = _MEANINGFUL_LINE_RE.findall(answer_text)
+        if lines:
+            return lines[-1]
     
     return answer_text.strip()
 
+# Characters ignored when comparing answers
+_ANSWER_STRIP_TABLE = str.maketrans('', '', ' \'"')
+
+def _normalize_answer(text: str) -> str:
+    """Lowercase and drop spaces and quotes, removing them in a single translate pass"""
+    return text.strip().lower().translate(_ANSWER_STRIP_TABLE)
+
 def compare_answers(predicted: str, ground_truth: str) -> bool:
     """Compare predicted answer with ground truth"""
     # Normalize
-    pred_clean = predicted.strip().lower().replace(' ', '').replace("'", '').replace('"', '')
-    gt_clean = ground_truth.strip().lower().replace(' ', '').replace("'", '').replace('"', '')
+    pred_clean = _normalize_answer(predicted)
+    gt_clean = _normalize_answer(ground_truth)
     
     # Exact match
     if pred_clean == gt_clean:
@@ -376,27 +477,119 @@ def compare_answers(predicted: str, ground_truth: str) -> bool:
     
     return False
 
-def process_samples_sequential(
+async def _process_samples_async(
+    samples: List[Tuple[str, str]],
+    config: Dict[str, Any],
+    vlm_agent: VLMAgentEAS,
+    results_dir: Path,
+    chunk_size: int,
+    io_pool: Optional[ThreadPoolExecutor] = None
+) -> List[Dict[str, Any]]:
+    """Run samples concurrently; blocking VLM calls go to a thread pool, bounded by a semaphore"""
+    results = []
+    total = len(samples)
+    max_concurrency = max(1, config['max_concurrency'])
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    started = 0
+    # Running tallies for the progress line, updated once per finished sample
+    success_count = 0
+    correct_count = 0
+    with_gt = 0
+    # The current chunk file stays open until the next chunk starts
+    chunk_fh = None
+    chunk_fh_idx = -1
+    
+    async def run_one(img_path: str, json_path: str) -> Optional[Dict[str, Any]]:
+        nonlocal started
+        async with semaphore:
+            # Samples that have not started yet are skipped once an interrupt arrives
+            if interrupted:
+                return None
+            started += 1
+            print(f"\n[{started}/{total}] Processing: {Path(img_path).name}")
+            try:
+                return await loop.run_in_executor(
+                    executor, process_single_sample, img_path, json_path, config, vlm_agent, io_pool
+                )
+            except Exception as e:
+                logger.error("Unexpected error processing %s: %s", Path(img_path).name, e)
+                return {
+                    'image_path': img_path,
+                    'image_name': Path(img_path).name,
+                    'success': False,
+                    'error': str(e)
+                }
+    
+    try:
+        # Results are collected on the event loop thread, so chunk writes need no locking
+        for next_done in asyncio.as_completed([run_one(img_path, json_path) for img_path, json_path in samples]):
+            result = await next_done
+            if result is None:
+                continue
+            results.append(result)
+            idx = len(results)
+            success_count += bool(result.get('success'))
+            correct_count += result.get('correct') is True
+            with_gt += result.get('ground_truth') is not None
+            
+            # Save result to chunked file (10 items per file, in completion order)
+            chunk_idx = (idx - 1) // chunk_size
+            chunk_file = results_dir / f'results_chunk_{chunk_idx:04d}.jsonl'
+            
+            if chunk_idx != chunk_fh_idx:
+                if chunk_fh is not None:
+                    chunk_fh.close()
+                # Open in append mode for current chunk
+                chunk_fh = open(chunk_file, 'ab', buffering=1 << 16)
+                chunk_fh_idx = chunk_idx
+            chunk_fh.write(_dump_jsonl_line(result))
+            
+            # Log chunk transition
+            if idx % chunk_size == 1:
+                logger.info("Starting new chunk file: %s", chunk_file.name)
+            elif idx % chunk_size == 0:
+                logger.info("Completed chunk file: %s (%d items)", chunk_file.name, chunk_size)
+            
+            # Progress summary
+            if result.get('ground_truth'):
+                accuracy = correct_count / with_gt * 100 if with_gt > 0 else 0
+                print(f"Progress: {idx}/{total} | Success: {success_count}/{idx} | Accuracy: {correct_count}/{with_gt} ({accuracy:.1f}%)")
+            else:
+                print(f"Progress: {idx}/{total} | Success: {success_count}/{idx}")
+    finally:
+        executor.shutdown(wait=True)
+        if chunk_fh is not None:
+            chunk_fh.close()
+    
+    if interrupted:
+        logger.warning(f"\nProcessing interrupted after {len(results)}/{total} samples")
+    
+    return results
+
+def process_samples_concurrent(
     samples: List[Tuple[str, str]], 
     config: Dict[str, Any]
 ) -> List[Dict[str, Any]]:
-    """Process samples sequentially (single process) with interrupt support"""
-    global interrupted
-    
+    """Process samples concurrently (single process) with interrupt support"""
     results = []
     total = len(samples)
     
-    logger.info(f"Starting sequential processing of {total} samples")
+    logger.info(f"Starting processing of {total} samples, up to {config['max_concurrency']} at a time")
     logger.info("Press Ctrl+C to interrupt at any time\n")
     
-    # Initialize VLM agent once (reuse for all samples)
+    # Initialize VLM agent once (shared by all samples and threads)
     try:
         vlm_agent = VLMAgentEAS(
             base_url=config['eas_url'],
             token=config['eas_token'],
             model_name=config['model_name'],
             max_tokens=config['max_tokens'],
-            timeout=config['timeout']
+            timeout=config['timeout'],
+            # Opt-in: identical endpoint + image + prompt + model replays the cached response
+            cache_dir=config['cache_dir'],
+            max_image_side=config['preresize'] or None
         )
     except Exception as e:
         logger.error(f"Failed to initialize VLM agent: {e}")
@@ -407,61 +600,15 @@ def process_samples_sequential(
     results_dir.mkdir(parents=True, exist_ok=True)
     chunk_size = 10
     
-    # Process each sample
-    for idx, (img_path, json_path) in enumerate(samples, 1):
-        # Check if interrupted
-        if interrupted:
-            logger.warning(f"\nProcessing interrupted after {idx-1}/{total} samples")
-            break
-        
-        # Progress indicator
-        print(f"\n[{idx}/{total}] Processing: {Path(img_path).name}")
-        print("-" * 80)
-        
-        # Process sample
-        try:
-            result = process_single_sample(img_path, json_path, config, vlm_agent)
-            results.append(result)
-            
-            # Save result to chunked file (10 items per file)
-            chunk_idx = (idx - 1) // chunk_size
-            chunk_file = results_dir / f'results_chunk_{chunk_idx:04d}.jsonl'
-            
-            # Open in append mode for current chunk
-            with open(chunk_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(result, ensure_ascii=False) + '\n')
-            
-            # Log chunk transition
-            if idx % chunk_size == 1:
-                logger.info(f"Starting new chunk file: {chunk_file.name}")
-            elif idx % chunk_size == 0:
-                logger.info(f"Completed chunk file: {chunk_file.name} ({chunk_size} items)")
-            
-            # Progress summary
-            success_count = sum(1 for r in results if r.get('success'))
-            if result.get('ground_truth'):
-                correct_count = sum(1 for r in results if r.get('correct') is True)
-                with_gt = sum(1 for r in results if r.get('ground_truth') is not None)
-                accuracy = correct_count / with_gt * 100 if with_gt > 0 else 0
-                print(f"Progress: {idx}/{total} | Success: {success_count}/{idx} | Accuracy: {correct_count}/{with_gt} ({accuracy:.1f}%)")
-            else:
-                print(f"Progress: {idx}/{total} | Success: {success_count}/{idx}")
-            
-        except KeyboardInterrupt:
-            # Double Ctrl+C for immediate exit
-            logger.warning("\n⚠️  Force interrupted! Saving results...")
-            interrupted = True
-            break
-        except Exception as e:
-            logger.error(f"Unexpected error processing {Path(img_path).name}: {e}")
-            results.append({
-                'image_path': img_path,
-                'image_name': Path(img_path).name,
-                'success': False,
-                'error': str(e)
-            })
-    
-    logger.info(f"\nSequential processing {'interrupted' if interrupted else 'completed'}")
+    # Each sample is three sequential network-bound VLM calls, so overlap samples
+    io_pool = ThreadPoolExecutor(max_workers=INTERMEDIATE_IO_WORKERS)
+    try:
+        results = asyncio.run(_process_samples_async(samples, config, vlm_agent, results_dir, chunk_size, io_pool))
+    finally:
+        # Wait for pending image writes, including after an interrupt
+        io_pool.shutdown(wait=True)
+    
+    logger.info(f"\nProcessing {'interrupted' if interrupted else 'completed'}")
     logger.info(f"Processed: {len(results)}/{total} samples")
     
     return results
@@ -477,6 +624,7 @@ def calculate_metrics(results: List[Dict[str, Any]]) -> Dict[str, Any]:
     
     avg_time = sum(r.get('processing_time', 0) for r in results if r.get('success')) / max(success, 1)
     avg_confidence = sum(r.get('confidence', 0) for r in results if r.get('success')) / max(success, 1)
+    validation_skipped = sum(1 for r in results if r.get('validation_skipped'))
     
     metrics = {
         'total_samples': total,
@@ -487,7 +635,8 @@ def calculate_metrics(results: List[Dict[str, Any]]) -> Dict[str, Any]:
         'correct_predictions': correct,
         'accuracy': round(correct / len(with_gt) * 100, 2) if with_gt else None,
         'average_processing_time': round(avg_time, 2),
-        'average_confidence': round(avg_confidence, 2)
+        'average_confidence': round(avg_confidence, 2),
+        'validation_skipped': validation_skipped
     }
     
     return metrics
@@ -505,7 +654,7 @@ def main() -> None:
     
     logger.info("="*80)
     logger.info("Rotary Control Recognition Evaluation - Bbox Enhanced")
-    logger.info("Single-process sequential mode with interrupt support")
+    logger.info("Single-process concurrent mode with interrupt support")
     logger.info("="*80)
     logger.info(f"Dataset directory: {args.dataset_dir}")
     logger.info(f"Output directory: {args.output_dir}")
@@ -547,7 +696,11 @@ def main() -> None:
         'save_intermediate_images': args.save_intermediate_images,
         'question': args.question,
         'use_bbox': args.use_bbox,
-        'log_level': args.log_level
+        'log_level': args.log_level,
+        'max_concurrency': args.max_concurrency,
+        'cache_dir': args.cache_dir,
+        'preresize': args.preresize,
+        'always_validate': args.always_validate
     }
     
     # Clear old result files and create results_chunks directory
@@ -559,9 +712,9 @@ def main() -> None:
     else:
         results_chunks_dir.mkdir(parents=True, exist_ok=True)
     
-    # Process samples sequentially
+    # Process samples concurrently
     start_time = time.time()
-    results = process_samples_sequential(samples, config)
+    results = process_samples_concurrent(samples, config)
     total_time = time.time() - start_time
     
     # === Merge chunk files into single results.jsonl for convenience ===
@@ -569,10 +722,11 @@ def main() -> None:
     merged_result_file = Path(args.output_dir) / 'results.jsonl'
     chunk_files = sorted(results_chunks_dir.glob('results_chunk_*.jsonl'))
     
-    with open(merged_result_file, 'w', encoding='utf-8') as merged_f:
+    # Stream the bytes through a fixed buffer rather than decoding whole chunks into memory
+    with open(merged_result_file, 'wb') as merged_f:
         for chunk_file in chunk_files:
-            with open(chunk_file, 'r', encoding='utf-8') as chunk_f:
-                merged_f.write(chunk_f.read())
+            with open(chunk_file, 'rb') as chunk_f:
+                shutil.copyfileobj(chunk_f, merged_f, length=1 << 20)
     
     logger.info(f"Merged {len(chunk_files)} chunk files into {merged_result_file.name}")
     logger.info(f"Chunk files preserved in: {results_chunks_dir}/")
@@ -591,8 +745,11 @@ def main() -> None:
     
     # Save evaluation report
     report_file = Path(args.output_dir) / 'eval_report.json'
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(metrics, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        report_file.write_bytes(orjson.dumps(metrics, option=orjson.OPT_INDENT_2))
+    else:
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, ensure_ascii=False, indent=2)
     
     # Print summary
     logger.info("")
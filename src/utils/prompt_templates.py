@@ -2,8 +2,11 @@
 Task-specific prompt templates - Provide dedicated prompts for different visual reasoning tasks
 Enhanced version with improved reasoning quality and visual prompts
 """
+import re
 from typing import Dict, Any, Optional, List
 
+_ANSWER_TAG_RE = re.compile(r'<answer>(.*?)</answer>', re.DOTALL | re.IGNORECASE)
+
 class TaskTemplates:
     """
     Task Template Manager
@@ -201,8 +204,7 @@ class TaskTemplates:
     @staticmethod
     def extract_answer_tag(text: str) -> Optional[str]:
         """Extract answer from <answer> tags"""
-        import re
-        match = re.search(r'<answer>(.*?)</answer>', text, re.DOTALL | re.IGNORECASE)
+        match = _ANSWER_TAG_RE.search(text)
         if match:
             return match.group(1).strip()
         return None
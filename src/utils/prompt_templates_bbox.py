@@ -186,8 +186,7 @@ class BboxEnhancedTemplates:
         Returns:
             Formatted prompt text
         """
-        template = BboxEnhancedTemplates.get_generic_rotary_template_with_bbox()
-        stage1_template = template['stage1']
+        stage1_template = _GENERIC_ROTARY_TEMPLATE['stage1']
         
         bbox_info, knob_bbox, mode_bboxes, _ = BboxEnhancedTemplates.format_bbox_info(knob_data)
         
@@ -212,3 +211,7 @@ class BboxEnhancedTemplates:
         if 'status' in knob_data and knob_data['status']:
             return knob_data['status'].get('label', None)
         return None
+
+
+# Static template, built once at import for the per-sample prompt builders
+_GENERIC_ROTARY_TEMPLATE = BboxEnhancedTemplates.get_generic_rotary_template_with_bbox()
@@ -13,12 +13,23 @@ import logging
 import re
 import io
 import base64
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, Union
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Straight baseline JPEG encode for intermediate images: no Huffman optimization
+# pass, no progressive scans, 4:2:0 chroma subsampling
+JPEG_SAVE_OPTIONS = {
+    'format': 'JPEG',
+    'quality': 90,
+    'optimize': False,
+    'progressive': False,
+    'subsampling': '4:2:0'
+}
+
 def save_geometric_info_to_json(
     geometric_info: Dict[str, Any],
     output_path: str
@@ -47,6 +58,14 @@ def parse_geometric_info_from_rules(rules_text: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing knob_center, knob_radius, red_pointer_angle, green_scale_lines
     """
+    geo_info = _parse_geometric_info_cached(rules_text)
+    # Hand out a fresh copy so callers can't mutate the cached entry
+    return {**geo_info, 'green_scale_lines': [dict(line) for line in geo_info['green_scale_lines']]}
+
+
+@lru_cache(maxsize=128)
+def _parse_geometric_info_cached(rules_text: str) -> Dict[str, Any]:
+    """Regex scan behind parse_geometric_info_from_rules, memoized on the rules text"""
     geo_info = {
         'knob_center': None,
         'knob_radius': None,
@@ -146,6 +165,18 @@ def parse_geometric_info_from_rules(rules_text: str) -> Dict[str, Any]:
     
     return geo_info
 
+def open_rgb_image(image_path: Union[str, Path]) -> Image.Image:
+    """
+    Open an image as RGB at its original resolution
+    
+    The size is left unchanged because the VLM geometry is expressed in
+    original pixel coordinates; already-RGB images skip the convert() copy.
+    """
+    img = Image.open(image_path)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
 def save_intermediate_images(
     image_path: str,
     results: Dict[str, Any],
@@ -177,9 +208,7 @@ def save_intermediate_images(
         if geo_info['knob_center'] and geo_info['knob_radius'] and geo_info['red_pointer_angle']:
             # Draw auxiliary lines based on parsed info
             logger.info(f"Drawing auxiliary lines for {image_name} based on VLM geometry")
-            img = Image.open(image_path)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+            img = open_rgb_image(image_path)
             
             # Import drawing function
             from .visualization_draw import draw_auxiliary_lines_on_image
@@ -194,7 +223,7 @@ def save_intermediate_images(
             
             # Save annotated image
             output_path = Path(output_dir) / f"{Path(image_name).stem}_auxiliary_lines.jpg"
-            img_with_lines.save(output_path, quality=95)
+            img_with_lines.save(output_path, **JPEG_SAVE_OPTIONS)
             logger.info(f"Saved auxiliary lines image: {output_path}")
         else:
             # Geometric info not available - save original image
@@ -330,7 +359,7 @@ def save_vlm_auxiliary_image(
             img = img.convert('RGB')
         
         # Save the VLM-generated annotated image
-        img.save(output_path, quality=95)
+        img.save(output_path, **JPEG_SAVE_OPTIONS)
         logger.info(f"Saved VLM-generated auxiliary image: {output_path}")
         
     except Exception as e:
@@ -354,11 +383,9 @@ def save_original_as_auxiliary(
         output_path = Path(output_dir) / f"{Path(image_name).stem}_auxiliary_lines.jpg"
         
         # Read and save original image
-        img = Image.open(image_path)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+        img = open_rgb_image(image_path)
         
-        img.save(output_path, quality=95)
+        img.save(output_path, **JPEG_SAVE_OPTIONS)
         logger.info(f"Saved original image as auxiliary (VLM fallback): {output_path}")
         
     except Exception as e: